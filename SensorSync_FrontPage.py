@@ -1,14 +1,26 @@
-from calendar import month
+import copy
+import os
 
 import pandas as pd
-from pyparsing import col
-from Sensor_Data import cleaning, manipulate_date, round_value
-import numpy as np
 import streamlit as st
-import seaborn as sns
-import matplotlib.pyplot as plt
-from SensorSync_FrontPage import *
 
+from Sensor_Anomaly import scan_anomalies
+from Sensor_Cache import CACHES, cache_key, cache_stats, content_hash
+from Sensor_Loader import file_hash
+from Sensor_Data import SENSOR_COLS, preprocess
+from Sensor_Downsample import machine_pyramid
+from Sensor_Ingest import CHUNK_ROWS, INGEST_DIR, append_upload, ingest_upload, server_exports
+from Sensor_Profile import PROFILE_DEFAULT, Profiler
+from Sensor_Rollup import append_rollup, dataset_rollup
+from Sensor_Scoring import (HORIZON_HOURS, WINDOW, latest_snapshot, load_risk_model, rank_fleet,
+                            snapshot_columns, update_snapshot)
+
+
+# dashboard refresh period and the risk that counts as an alert
+REFRESH_SECONDS = 60
+RISK_ALERT = 0.5
+ANOMALY_ROWS = 200
+TAB_NAMES = ["Overview", "Upload Data", "Exploratory Analysis", "Dashboard"]
 
 # modification of streamlit page
 st.set_page_config(
@@ -21,35 +33,107 @@ st.set_page_config(
 def clean_and_preprocessing(df):
     """This function takes a DataFrame as input and performs data cleaning and preprocessing steps, 
     including handling null values, manipulating date columns, and rounding sensor readings.
+    The work is done by Sensor_Data.preprocess in a single pass without copying the data.
     **Parameters:df
+    **Returns:DataFrame
+    """
+    with profiler.stage('preprocess', rows=len(df)):
+        return preprocess(df)
+
+
+# rendering a chart once per dataset and serving the cached PNG afterwards
+def show_chart(name, rollup):
+    """Looks up the PNG of chart `name` for the current dataset in the shared figure cache,
+    building it with Sensor_Charts.<name>_figure(rollup) on a miss. Sensor_Charts (and with it
+    matplotlib and seaborn) is only imported on the first miss.
+    **Parameters:name, rollup
+    **Returns:None
+    """
+    def build():
+        import Sensor_Charts
+        return Sensor_Charts.figure_png(getattr(Sensor_Charts, f'{name}_figure')(rollup))
+
+    with profiler.stage(f'eda/{name}'):
+        png = CACHES['figures'].get_or_compute((st.session_state.data.fingerprint(), name), build)
+        st.image(png, width='stretch')
+
+
+# appending an hourly delta to the loaded dataset and moving its derived data forward
+def append_delta(delta_file, parsed_key):
+    """Appends the readings of `delta_file` that are newer than the stored ones, then updates
+    the rollup and the latest snapshot from the delta instead of rebuilding them.
+    **Parameters:delta_file, parsed_key (cache key of the loaded dataset)
+    **Returns:str, the cache key of the extended dataset
+    """
+    # the loaded store may be shared with other sessions through CACHES['parsed'], so the
+    # delta goes into this session's own copy of it
+    shared = st.session_state.data
+    previous = shared.fingerprint()
+    dataset = shared.fork()
+    try:
+        with st.spinner("Appending the new readings"), profiler.stage('upload/append') as info:
+            delta = append_upload(dataset, delta_file, delta_file.name)
+            info['rows'] = len(delta)
+    except ValueError as error:
+        dataset.remove()
+        st.error(f"{delta_file.name} could not be appended: {error}")
+        return parsed_key
+    if delta.empty:
+        dataset.remove()
+        st.info("No readings newer than the stored ones.")
+        return parsed_key
+    st.session_state.data = dataset
+
+    with profiler.stage('upload/append_rollup', rows=len(delta)):
+        append_rollup(dataset, delta, previous)
+    snapshot = CACHES['derived'].get((previous, 'latest_snapshot'))
+    if snapshot is not None:
+        first_new = delta.groupby('machineID')['datetime'].min()
+        columns = snapshot_columns(dataset.columns)
+        recent = dataset.recent(first_new - pd.Timedelta(WINDOW), columns)
+        CACHES['derived'].put((dataset.fingerprint(), 'latest_snapshot'), update_snapshot(snapshot, recent))
+    scanned = CACHES['derived'].get((previous, 'anomalies'))
+    if scanned is not None:
+        detector, found = scanned
+        # the previous dataset's entry keeps its own detector
+        detector, new = scan_anomalies([delta], copy.deepcopy(detector))
+        CACHES['derived'].put((dataset.fingerprint(), 'anomalies'), (detector, pd.concat([found, new], ignore_index=True)))
+
+    # the extended copy gets its own key; the original stays cached for the sessions using it
+    key = cache_key(parsed_key, 'append', dataset.fingerprint())
+    CACHES['parsed'].put(key, dataset)
+    st.success(f"{len(delta):,} new rows appended for {delta['machineID'].nunique():,} machines")
+    return key
+
+
+# raw sensor traces of one machine, downsampled to about screen resolution
+def machine_traces(dataset):
+    """Machine and date-range selectors over the per-machine sensor traces. Each trace is read
+    from the machine's min/max pyramid, so the points drawn stay bounded whatever the range.
+    **Parameters:dataset
     **Returns:None
     """
-    df_clean = df.copy()
-
-    # Handling missing values for 'age' column
-    if 'age' in df_clean.columns:
-        df_clean['age'] = df_clean['age'].fillna(df_clean['age'].median())
-        df_clean['age'] = df_clean['age'].astype(int)
-
-    # DateTime Manipulation
-    if 'datetime' in df_clean.columns:
-        df_clean['datetime'] = pd.to_datetime(df_clean['datetime'])
-        df_clean['year'] = df_clean['datetime'].dt.year
-        df_clean['month_num'] = df_clean['datetime'].dt.month
-        df_clean['date'] = df_clean['datetime'].dt.day
-        df_clean['hour'] = df_clean['datetime'].dt.hour
-
-        mounth_map = {1:'Jan', 2:'Feb', 3:'Mar', 4:'Apr', 5:'May', 6:'Jun',
-                            7:'July', 8:'Aug', 9:'Sep', 10:'Oct', 11:'Nov', 12:'Dec'}
-        df_clean['month'] = df_clean['month_num'].map(mounth_map)
-
-    # Rounding sensor readings to 2 decimal places
-    sensor_cols = ['volt', 'rotate', 'pressure', 'vibration']
-    for col in sensor_cols:
-        if col in df_clean.columns:
-            df_clean[col] = round(df_clean[col], 2)
-
-    return df_clean
+    st.subheader("Multi sensor Time Series per Machine")
+    c1, c2 = st.columns([1, 2])
+    machine = c1.selectbox("Machine", dataset.watermarks().index, key='trace_machine')
+    with profiler.stage('eda/trace_pyramid'):
+        pyramid = machine_pyramid(dataset, machine)
+    first, last = (pd.Timestamp(t) for t in pyramid.span(machine))
+    dates = c2.date_input("Date range", (first.date(), last.date()), min_value=first.date(),
+                          max_value=last.date(), key=f'trace_dates_{machine}')
+    if len(dates) != 2:
+        return
+
+    end = pd.Timestamp(dates[1]) + pd.Timedelta('1D') - pd.Timedelta('1s')
+    with profiler.stage('eda/traces') as info:
+        traces = pyramid.query(machine, pd.Timestamp(dates[0]), end)
+        info['rows'] = sum(len(trace) for trace in traces.values())
+        for row in range(0, len(traces), 2):
+            for column, (sensor, trace) in zip(st.columns(2), list(traces.items())[row:row + 2]):
+                column.caption(f"{sensor.capitalize()} — {len(trace):,} points")
+                column.line_chart(trace, height=220)
+
+
 CUSTOM_CSS = r"""
     <style>
 :root[data-theme="light"] {
@@ -121,246 +205,370 @@ st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 if 'data' not in st.session_state:
     st.session_state['data'] = None
 
-tabs = st.tabs(["Overview", "Upload Data", "Exploratory Analysis", "Dashboard"])
+# per-session timings; the switch lives in the Diagnostics panel of the sidebar
+if 'profiler' not in st.session_state:
+    st.session_state['profiler'] = Profiler()
+profiler = st.session_state.profiler
+with st.sidebar:
+    diagnostics = st.expander("Diagnostics")
+    profiler.enabled = diagnostics.toggle("Record timings", value=PROFILE_DEFAULT, key='profile_enabled')
+profiler.start_run()
 
+# only the selected tab's content runs; switching tabs reruns the script
+tabs = st.tabs(TAB_NAMES, key='active_tab', on_change='rerun')
 
-with tabs[0]:
-    st.markdown(
-        """
-            <div style='display:flex;justify-content:space-between;align-items:center;margin-bottom:20px'>
-            <div>
-                <h1 style='margin:0;background:linear-gradient(90deg,#06b6d4,#7c3aed);-webkit-background-clip:text;-webkit-text-fill-color:transparent;'>
-                    WareHouse Sensor Readings
-                </h1>
-                <div style='color:gray;font-size:15px;'>AI-powered, monitoring and Analysis — Derives Hided information from raw sensor Data obtained from sensors in a Company</div>
-            </div>
-            </div>
-            """,
-        unsafe_allow_html=True
-    )
-
-    st.markdown("<div style='margin-bottom:10px'></div>", unsafe_allow_html=True)
 
-    c1, c2, c3 = st.columns([6.75, 5.55, 6.69])
-
-    with c1:
+with tabs[0]:
+    if tabs[0].open:
         st.markdown(
-            "<div class='card'><h4 style='margin:0'>Why need this system?</h4>"
-            "<div style='color:gray;margin-top:6px'>Implementing an industrial sensor monitoring system transforms a company’s " \
-            "operations by shifting from costly, reactive 'run-to-failure' models to Predictive Maintenance (PdM), " \
-            "which utilizes real-time data like vibration and pressure to catch mechanical issues weeks before they escalate. " \
-            "This proactive approach eliminates expensive unplanned downtime by allowing repairs to be scheduled during off-peak hours, " \
-            "while simultaneously enhancing workplace safety through automated logic controls that shut down equipment in dangerous 'red-zone' conditions. " \
-            "Furthermore, by keeping machinery running within optimal parameters, companies significantly extend asset lifespans and delay massive capital expenditures, " \
-            "all while utilizing 'black box' Root Cause Analysis to prevent repeat failures and optimizing resource efficiency by targeting labor and energy usage only where it is truly needed.</div></div>",
-            unsafe_allow_html=True
-        )
-
-        key_stats = [
             """
-            * Total Asset Loss: Historically, without sensor monitoring, 5% to 10% of heavy industrial machinery experiences a "fatal" catastrophic breakdown annually that requires total replacement..
-            * The Cost of a "Crash": Unplanned system crashes result in an average of 12–24 hours of downtime; for high-output companies, this translates to a loss of 20,000 - 200,000 dollars per hour depending on the industry.
-            * The "Age" Multiplier: Machine risk increases exponentially after 15 years of service; sensor data shows that machines in this age bracket are 3.5x more likely to experience voltage spikes that fry internal circuits.
-            """
-        ]
-
-    with c2:
-        st.markdown(
-            f"""
-            <div class='card' style='text-align:left'>
-            <h5 style='margin:0'>Key Stats and risk</h5>
-            <div style='color:gray;margin-top:6px'>
-            {' '.join(key_stats)}
-            </div>
-            </div>
-            """,
+                <div style='display:flex;justify-content:space-between;align-items:center;margin-bottom:20px'>
+                <div>
+                    <h1 style='margin:0;background:linear-gradient(90deg,#06b6d4,#7c3aed);-webkit-background-clip:text;-webkit-text-fill-color:transparent;'>
+                        WareHouse Sensor Readings
+                    </h1>
+                    <div style='color:gray;font-size:15px;'>AI-powered, monitoring and Analysis — Derives Hided information from raw sensor Data obtained from sensors in a Company</div>
+                </div>
+                </div>
+                """,
             unsafe_allow_html=True
         )
 
-        crash_type = [
-            """
-            * Kinetic & Mechanical Crashes: These involve physical failures in moving parts like conveyors and AGVs, often caused by jams or snaps that immediately halt the physical movement of goods.
-            * Electrical & Control System Crashes: These are "invisible" failures, such as brownouts or communication blackouts, where power fluctuations or signal loss paralyze the facility's "brain" and logic.
-            * Hydraulic & Pneumatic Crashes: These occur in lifting and sorting equipment when pressure loss or seal blowouts cause sudden, gravity-driven failures of heavy loads.
-            * Rack & Structural Collapses: The most catastrophic warehouse event, these are domino-effect failures usually triggered by unreported structural "injuries" that lead to total racking failure.
-            """
-        ]
-    with c3:
-        st.markdown(
-            f"""
-            <div class='card' style='text-align:left'>
-            <h8 style='margin:0'>common crash types</h8>
-            <div style='color:gray;margin-top:6px'>
-            {' '.join(crash_type)}
-            </div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
-    st.markdown("<br>", unsafe_allow_html=True)
-
+        st.markdown("<div style='margin-bottom:10px'></div>", unsafe_allow_html=True)
+
+        c1, c2, c3 = st.columns([6.75, 5.55, 6.69])
+
+        with c1:
+            st.markdown(
+                "<div class='card'><h4 style='margin:0'>Why need this system?</h4>"
+                "<div style='color:gray;margin-top:6px'>Implementing an industrial sensor monitoring system transforms a company’s " \
+                "operations by shifting from costly, reactive 'run-to-failure' models to Predictive Maintenance (PdM), " \
+                "which utilizes real-time data like vibration and pressure to catch mechanical issues weeks before they escalate. " \
+                "This proactive approach eliminates expensive unplanned downtime by allowing repairs to be scheduled during off-peak hours, " \
+                "while simultaneously enhancing workplace safety through automated logic controls that shut down equipment in dangerous 'red-zone' conditions. " \
+                "Furthermore, by keeping machinery running within optimal parameters, companies significantly extend asset lifespans and delay massive capital expenditures, " \
+                "all while utilizing 'black box' Root Cause Analysis to prevent repeat failures and optimizing resource efficiency by targeting labor and energy usage only where it is truly needed.</div></div>",
+                unsafe_allow_html=True
+            )
+
+            key_stats = [
+                """
+                * Total Asset Loss: Historically, without sensor monitoring, 5% to 10% of heavy industrial machinery experiences a "fatal" catastrophic breakdown annually that requires total replacement..
+                * The Cost of a "Crash": Unplanned system crashes result in an average of 12–24 hours of downtime; for high-output companies, this translates to a loss of 20,000 - 200,000 dollars per hour depending on the industry.
+                * The "Age" Multiplier: Machine risk increases exponentially after 15 years of service; sensor data shows that machines in this age bracket are 3.5x more likely to experience voltage spikes that fry internal circuits.
+                """
+            ]
+
+        with c2:
+            st.markdown(
+                f"""
+                <div class='card' style='text-align:left'>
+                <h5 style='margin:0'>Key Stats and risk</h5>
+                <div style='color:gray;margin-top:6px'>
+                {' '.join(key_stats)}
+                </div>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+
+            crash_type = [
+                """
+                * Kinetic & Mechanical Crashes: These involve physical failures in moving parts like conveyors and AGVs, often caused by jams or snaps that immediately halt the physical movement of goods.
+                * Electrical & Control System Crashes: These are "invisible" failures, such as brownouts or communication blackouts, where power fluctuations or signal loss paralyze the facility's "brain" and logic.
+                * Hydraulic & Pneumatic Crashes: These occur in lifting and sorting equipment when pressure loss or seal blowouts cause sudden, gravity-driven failures of heavy loads.
+                * Rack & Structural Collapses: The most catastrophic warehouse event, these are domino-effect failures usually triggered by unreported structural "injuries" that lead to total racking failure.
+                """
+            ]
+        with c3:
+            st.markdown(
+                f"""
+                <div class='card' style='text-align:left'>
+                <h8 style='margin:0'>common crash types</h8>
+                <div style='color:gray;margin-top:6px'>
+                {' '.join(crash_type)}
+                </div>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+        st.markdown("<br>", unsafe_allow_html=True)
+
+# the upload tab always runs: a file_uploader that is not drawn in a run forgets its file
 with tabs[1]:
     col1, col2 = st.columns([4, 2])
 
     with col1:
         upload_file = st.file_uploader("Upload Warehouse Dataset", type=['csv', 'xlsx'])
+        # a browser upload sits in memory whole; larger exports are read from disk on the server
+        exports = server_exports()
+        server_file = st.selectbox(f"Or ingest an export from {INGEST_DIR} on the server", exports, index=None,
+                                   format_func=os.path.basename) if exports and upload_file is None else None
+
+        source = upload_file if upload_file is not None else server_file
+        if source is not None:
+            if upload_file is not None:
+                st.success("File Uploaded successfully!")
+                name, file_id = upload_file.name, upload_file.file_id
+            else:
+                stat = os.stat(server_file)
+                name, file_id = os.path.basename(server_file), (server_file, stat.st_mtime_ns, stat.st_size)
+
+            # hash the upload once per file; the parsed store is shared by every session
+            if st.session_state.get('data_file_id') != file_id:
+                with profiler.stage('upload/hash'):
+                    st.session_state['upload_hash'] = (content_hash(upload_file) if upload_file is not None
+                                                       else file_hash(server_file))
+                st.session_state['data_file_id'] = file_id
+                st.session_state.pop('parsed_key', None)
+
+            def ingest():
+                progress = st.progress(0.0, text="Extracting the Uploaded WareHouse Dataset!")
+                if upload_file is not None:
+                    upload_file.seek(0)
+                with profiler.stage('upload/ingest') as info:
+                    dataset = ingest_upload(
+                        source, name, chunk_rows=CHUNK_ROWS,
+                        progress=lambda fraction, rows: progress.progress(
+                            fraction, text=f"Extracting the Uploaded WareHouse Dataset! {rows:,} rows preprocessed"))
+                    info['rows'] = len(dataset)
+                progress.empty()
+                return dataset
+
+            ingest_key = cache_key(st.session_state['upload_hash'], 'ingest', chunk_rows=CHUNK_ROWS,
+                                   excel=not name.lower().endswith('.csv'))
+            parsed_key = st.session_state.get('parsed_key') or ingest_key
+            # a file that failed to ingest is not read again on every rerun
+            failed_id, failure = st.session_state.get('ingest_error') or (None, None)
+            if failed_id != file_id:
+                failure = None
+                try:
+                    if parsed_key == ingest_key:
+                        st.session_state.data = CACHES['parsed'].get_or_compute(parsed_key, ingest)
+                    elif CACHES['parsed'].get(parsed_key) is None:
+                        # only append_delta fills an append key; ingesting the upload again would drop
+                        # the appended rows, so an evicted entry is restored from the session's store
+                        CACHES['parsed'].put(parsed_key, st.session_state.data)
+                except ValueError as error:
+                    failure = str(error)
+                    st.session_state['ingest_error'] = (file_id, failure)
+
+            if failure is not None:
+                st.session_state.data = None
+                st.error(f"{name} could not be read: {failure}")
+            else:
+                st.session_state['parsed_key'] = parsed_key
+
+                delta_file = st.file_uploader("Append new readings", type=['csv', 'xlsx'], key='delta_upload')
+                if delta_file is not None and st.session_state.get('delta_file_id') != delta_file.file_id:
+                    parsed_key = append_delta(delta_file, parsed_key)
+                    st.session_state['parsed_key'] = parsed_key
+                    st.session_state['delta_file_id'] = delta_file.file_id
 
-        if upload_file is not None:
-            st.success("File Uploaded successfully!")
-            
-            with st.spinner("Extracting the Uploaded WareHouse Dataset!"):
-                if upload_file.name.endswith('.csv'):
-                    data_raw = pd.read_csv(upload_file)
-                    st.write(f"Data Preview: {data_raw.head()}")
-                else:
-                    data_raw = pd.read_excel(upload_file)
-                    st.write(f"Data Preview: {data_raw.head()}")
-
-                st.session_state.data = clean_and_preprocessing(data_raw) 
                 st.success("Data cleaned and preprocessed successfully!")
-                st.dataframe(st.session_state.data.head())           
+                st.write(f"{len(st.session_state.data):,} rows stored on disk")
+                st.dataframe(CACHES['derived'].get_or_compute((parsed_key, 'head'), st.session_state.data.head))
         else:
+            st.session_state.pop('parsed_key', None)
             st.warning("No file uploaded. Please upload a CSV or Excel file to proceed.")
 
         
 
 
 with tabs[2]:
-    st.header(
-        "Problem Statement and Modeling Approach")
-    st.set_page_config(
-        page_title="Exploratory Analysis", 
-        layout="wide", 
-        initial_sidebar_state="expanded")
-    
-    st.markdown("""    
-    ## Problem Statement
-    Imagine this real-world scenario: A maintenance or field services team manages a fleet of thousands of machines, each with multiple components that may fail over time. Every morning, the team must decide which machines and components to prioritize for maintenance. Inspecting every machine daily is impossible, and the team desperately needs a data driven way to allocate resources effectively. This challenge is common and represents a perfect opportunity to implement **predictive maintenance** solutions.
-    While it can be tempting for data teams to jump straight into **deep learning models**, I’ve been exploring a different approach: the **Cox Proportional Hazards (Cox PH) model with time-varying covariates** using the `lifelines` Python library. This method is highly interpretable, computationally efficient, and familiar to many reliability and quality engineers. It also integrates well with telemetry **IoT signals**, making it ideal for predictive maintenance.
-    In this app, we’ll use the **Azure Predictive Maintenance dataset** to demonstrate how a Cox PH model can be developed and deployed to support smarter maintenance decisions. Specifically, I’ll show how to extend the model with time-varying covariates to estimate the **probability of a component failing within the next 2 days**, a practical use case that empowers teams to prioritize work based on dynamic risk estimates informed by real-time telemetry.
-    Before diving in, here’s why this modeling approach stands out:
-
-    ✅ Combines static attributes (e.g., manufacturer, install date) with real-time telemetry data  
-    ✅ Easily integrates into production pipelines using Python and open-source tools like `lifelines`  
-    ✅ Produces actionable failure probabilities with minimal post-processing  
-    ✅ Handles censored data and class imbalance—both common in maintenance scenarios  
-    ✅ Bridges the gap between data science teams and reliability engineers familiar with these models in tools like JMP or Minitab, now with scalable and automatable Python workflows  
-    """)
-    
-    st.divider()
-    st.header("Data Overview")
-    st.markdown("""
-                The dataset contains 884,166 rows of sensor telemetry data collected from a fleet of machines over 
-                a 12-month period. Each row represents a snapshot of sensor readings at a specific timestamp, 
-                along with the corresponding machine ID and an errorID that indicates whether a failure occurred 
-                within the next 2 days. The dataset includes the following key features: 
-
-                1. The Identity & Lifecycle Columns:
-
-                ✅ `model`: The specific category or series of the machine. Different models in the dataset have different "nominal" operating ranges; 
-                    for example, a high-speed sorter will naturally have a higher rotate value than a heavy-duty lift.\n
-                ✅ `age`: The number of years the machine has been in service. In reliability engineering, this is used to calculate the "Bathtub Curve"—where machines are most likely to fail when they are brand new (infant mortality) or very old (wear-out phase).
-
-                2. The Telemetry (Sensor) Columns
-                These are your continuous variables that describe the "vitals" of the equipment:
-
-                ✅ `volt (Voltage)`: Measures electrical input. Sudden spikes can indicate power surges, while "dips" might suggest a motor is struggling to draw power.\n
-                ✅ `rotate (Rotation/RPM)`: The speed at which the internal motor or components are spinning.\n
-                ✅ `pressure`: Usually relates to hydraulic or pneumatic systems. A sudden drop often points to a seal leak, while a steady increase suggests a blockage.\n
-                ✅ `vibration`: The most critical indicator for mechanical health. High vibration is almost always a sign of misalignment, loose bolts, or worn-out bearings.\n
-
-                3. The Event & Failure Columns:
-
-                ✅ `errorID`: These are non-breaking alerts. Think of them as "yellow lights" on a dashboard. They indicate the machine is still running, but something is suboptimal.\n
-                ✅ `failure`: This is your "target variable." It marks the moment the machine actually stopped working. Usually, this is categorized by which component failed (e.g., comp1, comp2).\n
-                ✅ `comp`: Indicates which specific part was replaced or serviced during a maintenance event.\n
-
-                4. The Time Intelligence Columns:
-
-                ✅ `datetime`: The precise timestamp of the reading.\n
-                ✅ `year, month, date, hour`: These are "features" engineered from the datetime.
-                    `hour` is vital for finding shift-change patterns.
-                    month helps identify seasonality (e.g., do machines overheat more in the summer?).
-                """)
-    
-    st.divider()
-    st.header("Exploratory Data Analysis")
-    st.markdown(""" 
-                Exploratory Data Analysis (EDA) is the most critical phase of this industrial project because it allows you to transform raw 
-                sensor telemetry into actionable business intelligence by uncovering the "hidden" relationships between machine health and operational variables. 
-                By performing EDA, you can identify critical sensor correlations—such as how a specific increase in vibration and pressure creates 
-                a "danger zone" for failure—and detect anomalies or outliers that represent early warning signs of the warehouse crashes described earlier. 
-                Furthermore, EDA helps you understand the seasonal and hourly patterns of errorID occurrences, ensuring that your predictive models 
-                aren't biased by "noisy" data or mislabeled NaN values. Ultimately, this process validates your data's integrity and provides the 
-                statistical foundation needed to move from a reactive maintenance mindset to a high-value, predictive maintenance strategy that 
-                saves the company thousands in unplanned downtime.
-                """)
-    
-    r1c1, r1c2 = st.columns([3, 2])
-    r2c1, r2c2 = st.columns([3, 2])
-
-    with r1c1:
-        st.subheader("Failure Component Count With Percentage")
-        # failure count of the components
-        failure_summary = combine_copy['failure'].value_counts().reset_index()
-        failure_summary.columns = ['Failure Type', 'Frequency']
-        total_rows = len(combine_copy)
-        failure_summary['Percentage (%)'] = (failure_summary['Frequency'] / total_rows) * 100
-        failure_summary['Percentage (%)'] = failure_summary['Percentage (%)'].round(2)
-
-        plt.subplots(figsize=(18, 7))
-        ax = sns.barplot(data=failure_summary, x='Failure Type', y='Percentage (%)', hue='Failure Type')
-        for container in ax.containers:
-            ax.bar_label(container, padding=3)
-        plt.ylabel('count')
-        plt.yscale('log')
-        plt.title('Failure Component Count With Percentage')
-        plt.show()
-
-    with r1c2:
-        st.subheader("Failure Probability by Age")
-        # Placeholder for the plot
-
-        plt.subplots(figsize=(18, 7))
-        sns.histplot(data=combine_copy, x='age', hue='failure', bins=3, multiple='dodge')
-        plt.yscale('log')
-        plt.title('Failure Probability by Age')
-        plt.show()
-        
+    if tabs[2].open:
+        st.header(
+            "Problem Statement and Modeling Approach")
+
+        st.markdown("""    
+        ## Problem Statement
+        Imagine this real-world scenario: A maintenance or field services team manages a fleet of thousands of machines, each with multiple components that may fail over time. Every morning, the team must decide which machines and components to prioritize for maintenance. Inspecting every machine daily is impossible, and the team desperately needs a data driven way to allocate resources effectively. This challenge is common and represents a perfect opportunity to implement **predictive maintenance** solutions.
+        While it can be tempting for data teams to jump straight into **deep learning models**, I’ve been exploring a different approach: the **Cox Proportional Hazards (Cox PH) model with time-varying covariates** using the `lifelines` Python library. This method is highly interpretable, computationally efficient, and familiar to many reliability and quality engineers. It also integrates well with telemetry **IoT signals**, making it ideal for predictive maintenance.
+        In this app, we’ll use the **Azure Predictive Maintenance dataset** to demonstrate how a Cox PH model can be developed and deployed to support smarter maintenance decisions. Specifically, I’ll show how to extend the model with time-varying covariates to estimate the **probability of a component failing within the next 2 days**, a practical use case that empowers teams to prioritize work based on dynamic risk estimates informed by real-time telemetry.
+        Before diving in, here’s why this modeling approach stands out:
+
+        ✅ Combines static attributes (e.g., manufacturer, install date) with real-time telemetry data  
+        ✅ Easily integrates into production pipelines using Python and open-source tools like `lifelines`  
+        ✅ Produces actionable failure probabilities with minimal post-processing  
+        ✅ Handles censored data and class imbalance—both common in maintenance scenarios  
+        ✅ Bridges the gap between data science teams and reliability engineers familiar with these models in tools like JMP or Minitab, now with scalable and automatable Python workflows  
+        """)
+
+        st.divider()
+        st.header("Data Overview")
+        st.markdown("""
+                    The dataset contains 884,166 rows of sensor telemetry data collected from a fleet of machines over 
+                    a 12-month period. Each row represents a snapshot of sensor readings at a specific timestamp, 
+                    along with the corresponding machine ID and an errorID that indicates whether a failure occurred 
+                    within the next 2 days. The dataset includes the following key features: 
+
+                    1. The Identity & Lifecycle Columns:
+
+                    ✅ `model`: The specific category or series of the machine. Different models in the dataset have different "nominal" operating ranges; 
+                        for example, a high-speed sorter will naturally have a higher rotate value than a heavy-duty lift.\n
+                    ✅ `age`: The number of years the machine has been in service. In reliability engineering, this is used to calculate the "Bathtub Curve"—where machines are most likely to fail when they are brand new (infant mortality) or very old (wear-out phase).
+
+                    2. The Telemetry (Sensor) Columns
+                    These are your continuous variables that describe the "vitals" of the equipment:
+
+                    ✅ `volt (Voltage)`: Measures electrical input. Sudden spikes can indicate power surges, while "dips" might suggest a motor is struggling to draw power.\n
+                    ✅ `rotate (Rotation/RPM)`: The speed at which the internal motor or components are spinning.\n
+                    ✅ `pressure`: Usually relates to hydraulic or pneumatic systems. A sudden drop often points to a seal leak, while a steady increase suggests a blockage.\n
+                    ✅ `vibration`: The most critical indicator for mechanical health. High vibration is almost always a sign of misalignment, loose bolts, or worn-out bearings.\n
+
+                    3. The Event & Failure Columns:
+
+                    ✅ `errorID`: These are non-breaking alerts. Think of them as "yellow lights" on a dashboard. They indicate the machine is still running, but something is suboptimal.\n
+                    ✅ `failure`: This is your "target variable." It marks the moment the machine actually stopped working. Usually, this is categorized by which component failed (e.g., comp1, comp2).\n
+                    ✅ `comp`: Indicates which specific part was replaced or serviced during a maintenance event.\n
+
+                    4. The Time Intelligence Columns:
+
+                    ✅ `datetime`: The precise timestamp of the reading.\n
+                    ✅ `year, month, date, hour`: These are "features" engineered from the datetime.
+                        `hour` is vital for finding shift-change patterns.
+                        month helps identify seasonality (e.g., do machines overheat more in the summer?).
+                    """)
+
+        st.divider()
+        st.header("Exploratory Data Analysis")
+        st.markdown(""" 
+                    Exploratory Data Analysis (EDA) is the most critical phase of this industrial project because it allows you to transform raw 
+                    sensor telemetry into actionable business intelligence by uncovering the "hidden" relationships between machine health and operational variables. 
+                    By performing EDA, you can identify critical sensor correlations—such as how a specific increase in vibration and pressure creates 
+                    a "danger zone" for failure—and detect anomalies or outliers that represent early warning signs of the warehouse crashes described earlier. 
+                    Furthermore, EDA helps you understand the seasonal and hourly patterns of errorID occurrences, ensuring that your predictive models 
+                    aren't biased by "noisy" data or mislabeled NaN values. Ultimately, this process validates your data's integrity and provides the 
+                    statistical foundation needed to move from a reactive maintenance mindset to a high-value, predictive maintenance strategy that 
+                    saves the company thousands in unplanned downtime.
+                    """)
+
+        if st.session_state.data is None:
+            st.info("Upload a dataset in the Upload Data tab to see the charts.")
+        else:
+            # every chart below is drawn from the rollup, built once per dataset
+            with profiler.stage('eda/rollup'):
+                rollup = dataset_rollup(st.session_state.data)
 
-    with r2c1:
-        st.subheader("Health Profile Box Plot")
-        # Placeholder for the plot
-
-        fig, axes = plt.subplots(2, 2, figsize=(18, 14))
-        fig.suptitle('Sensor Distribution by Machine Model', fontsize=20)
-
-        sensors = ['volt', 'rotate', 'pressure', 'vibration']
-        for i, sensor in enumerate(sensors):
-            ax = axes[i//2, i%2]
-            sns.boxplot(data=combine_copy, x='model', y=sensor, ax=ax, palette='viridis')
-            ax.set_title(f'{sensor.capitalize()} Distribution')
-    
-        plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-
-    
-    with r2c2:
-        st.subheader("Multi sensor Time Series")
-        # Placeholder for the plot
-
-        values = ['volt', 'rotate', 'pressure', 'vibration']
-        fig, axes = plt.subplots(2, 2,  figsize=(18,14))
-        fig.suptitle('Multi-sensor Time Series', fontsize=20)
-
-        for i, values in enumerate(values):
-            ax = axes[i//2, i%2]
-            sns.lineplot(data=combine_copy, x='hour', y=values, ax=ax, hue=None, palette='viridis', errorbar=None)
-            ax.set_title(f'{values.capitalize()} Trend By Hour')
-        plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-        plt.show()
+            r1c1, r1c2 = st.columns([3, 2])
+            r2c1, r2c2 = st.columns([3, 2])
+
+            with r1c1:
+                st.subheader("Failure Component Count With Percentage")
+                if rollup.failures is None:
+                    st.info("The dataset has no failure column.")
+                else:
+                    show_chart('failure_count', rollup)
+
+            with r1c2:
+                st.subheader("Failure Probability by Age")
+                if rollup.ages is None:
+                    st.info("The dataset needs age and failure columns.")
+                else:
+                    show_chart('age_failure', rollup)
+
+            with r2c1:
+                st.subheader("Health Profile Box Plot")
+                if rollup.sketch is None:
+                    st.info("The dataset needs model and sensor columns.")
+                else:
+                    show_chart('health_profile', rollup)
+
+            with r2c2:
+                st.subheader("Multi sensor Time Series")
+                if rollup.hourly is None:
+                    st.info("The dataset needs datetime and sensor columns.")
+                else:
+                    show_chart('hourly_trend', rollup)
+
+            if {'machineID', 'datetime'} <= set(st.session_state.data.columns):
+                machine_traces(st.session_state.data)
 
-        
+
+
+
+# ranking the fleet by failure risk, re-scored on a timer
+@st.fragment(run_every=REFRESH_SECONDS)
+def fleet_risk():
+    """Scores every machine's latest snapshot with the saved Cox coefficients and shows the
+    fleet ranked by its riskiest component. The snapshot is cached per dataset, so a refresh
+    only repeats the batched scoring.
+    **Parameters:None
+    **Returns:None
+    """
+    try:
+        model = load_risk_model()
+    except FileNotFoundError:
+        st.info("No trained models found. Train them with `python Sensor_Survival.py`.")
+        return
+
+    dataset = st.session_state.data
+    columns = snapshot_columns(dataset.columns)
+    with profiler.stage('dashboard/snapshot'):
+        snapshot = CACHES['derived'].get_or_compute((dataset.fingerprint(), 'latest_snapshot'),
+                                                    lambda: latest_snapshot(dataset.iter_chunks(columns)))
+    with profiler.stage('dashboard/scoring', rows=len(snapshot)):
+        ranked = rank_fleet(model, snapshot)
+
+    top = ranked.iloc[0]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Machines scored", f"{len(ranked):,}")
+    c2.metric(f"Above {RISK_ALERT:.0%} risk", int((ranked['max_risk'] > RISK_ALERT).sum()))
+    c3.metric("Riskiest machine", f"{top.name} ({top['top_component']})", f"{top['max_risk']:.1%}",
+              delta_color='inverse')
+
+    st.subheader(f"Probability of failure within the next {HORIZON_HOURS} hours")
+    st.dataframe(ranked, column_config={col: st.column_config.NumberColumn(format='percent')
+                                        for col in ranked.columns if 'risk' in col})
+
+
+# red-zone readings: sensor values far outside each machine's recent behaviour
+def sensor_anomalies(dataset):
+    """Lists the readings flagged by the EWMA anomaly detector, newest first. The scan runs once
+    per dataset and is carried forward over appended rows.
+    **Parameters:dataset
+    **Returns:None
+    """
+    columns = [c for c in ['machineID', 'datetime', *SENSOR_COLS] if c in dataset.columns]
+    with profiler.stage('dashboard/anomalies'):
+        _, found = CACHES['derived'].get_or_compute((dataset.fingerprint(), 'anomalies'),
+                                                    lambda: scan_anomalies(dataset.iter_chunks(columns)))
+    st.subheader("Sensor anomalies")
+    if found.empty:
+        st.info("No readings outside the anomaly bands.")
+        return
+    st.caption(f"{len(found):,} flagged readings on {found['machineID'].nunique():,} machines; "
+               "z is the distance from the machine's EWMA mean in EWMA standard deviations")
+    st.dataframe(found.sort_values('datetime', ascending=False).head(ANOMALY_ROWS), hide_index=True)
 
 
 with tabs[3]:
-    st.header("Dashboard")
\ No newline at end of file
+    if tabs[3].open:
+        st.header("Dashboard")
+
+        if st.session_state.data is None:
+            st.info("Upload a dataset in the Upload Data tab to see the fleet risk ranking.")
+        else:
+            fleet_risk()
+            sensor_anomalies(st.session_state.data)
+
+
+# cache counters, drawn last so they include this run's lookups
+with st.sidebar:
+    with st.expander("Cache statistics"):
+        st.dataframe(cache_stats())
+
+# timings of this rerun and of the session so far, drawn into the panel opened at the top
+profiler.end_run()
+with diagnostics:
+    if not profiler.enabled:
+        st.caption("Timings are off. Start the app with SENSORSYNC_PROFILE=1 to record from the first run.")
+    elif profiler.records:
+        st.caption(f"Run {profiler.run}")
+        st.dataframe(profiler.frame(profiler.run).drop(columns=['run', 'time']), hide_index=True)
+        st.caption("All runs")
+        st.dataframe(profiler.summary())
+        st.download_button("Export JSON lines", profiler.to_jsonl(), file_name='sensorsync-profile.jsonl',
+                           mime='application/json')
+        if st.button("Clear timings"):
+            profiler.clear()
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from Sensor_Data import SENSOR_COLS
+
+# EWMA smoothing over about a day of hourly readings: alpha = 2 / (span + 1)
+SPAN = 24
+ALPHA = 2 / (SPAN + 1)
+
+# a reading is flagged when it is more than this many EWMA standard deviations from the EWMA mean
+THRESHOLDS = {'volt': 4.0, 'rotate': 4.0, 'pressure': 4.0, 'vibration': 4.0}
+
+# readings a series needs before it can flag anything
+WARMUP = 24
+
+
+class AnomalyDetector:
+    """Online EWMA mean/variance per key (machine by default, or machine model) and sensor.
+    The state is three numbers per key and sensor (mean, variance, readings seen), so
+    scoring a batch and then its continuation gives the same result as scoring both at once.
+    Each reading is compared with the statistics before it:
+        z = (x - mean) / sqrt(variance), flagged when |z| > threshold after the warm-up.
+    Within a batch the recursions run as first-order IIR filters along a (keys x readings)
+    array, so every key advances at once in compiled code.
+    """
+
+    def __init__(self, key: str = 'machineID', alpha: float = ALPHA, thresholds: dict = THRESHOLDS,
+                 warmup: int = WARMUP, sensors: list = SENSOR_COLS):
+        self.key = key
+        self.alpha = alpha
+        self.thresholds = {sensor: thresholds[sensor] for sensor in sensors}
+        self.warmup = warmup
+        self.keys = np.array([])
+        self.mean = np.empty((0, len(sensors)))
+        self.var = np.empty((0, len(sensors)))
+        self.count = np.empty((0, len(sensors)), dtype='int64')
+
+    @property
+    def sensors(self) -> list:
+        return list(self.thresholds)
+
+    def state(self) -> pd.DataFrame:
+        """Current mean, variance and reading count per key and sensor."""
+        columns = pd.MultiIndex.from_product([['mean', 'var', 'count'], self.sensors])
+        return pd.DataFrame(np.hstack([self.mean, self.var, self.count]), index=pd.Index(self.keys, name=self.key),
+                            columns=columns)
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Scores the readings of `df` and moves the state past them. Readings are taken in
+        time order per key; a batch is expected to follow the readings already seen.
+        **Parameters:df (with the key column, datetime and the sensors)
+        **Returns:DataFrame aligned with df: `<sensor>_z` (float32), `<sensor>_anomaly` (bool)
+        and `anomaly` (any sensor flagged)
+        """
+        keys, inverse = np.unique(df[self.key].to_numpy(), return_inverse=True)
+        self._add_keys(keys)
+        rows_key = np.searchsorted(self.keys, keys)[inverse]
+
+        # rows ordered by key then time; the stable sort keeps file order within a timestamp
+        ticks = df['datetime'].to_numpy(dtype='datetime64[ns]').view('int64')
+        order = np.lexsort((ticks, rows_key))
+        sorted_key = rows_key[order]
+
+        out = {}
+        flagged = np.zeros(len(df), dtype=bool)
+        for s, sensor in enumerate(self.sensors):
+            values = df[sensor].to_numpy(dtype='float64')[order]
+            present = ~np.isnan(values)
+            z = np.full(len(df), np.nan)
+            z[order[present]] = self._advance(s, sorted_key[present], values[present])
+
+            anomaly = np.abs(np.nan_to_num(z)) > self.thresholds[sensor]
+            out[f'{sensor}_z'] = z.astype('float32')
+            out[f'{sensor}_anomaly'] = anomaly
+            flagged |= anomaly
+
+        out['anomaly'] = flagged
+        return pd.DataFrame(out, index=df.index)
+
+    # one sensor: readings grouped by key in time order -> z-scores, state updated in place
+    def _advance(self, s: int, key: np.ndarray, values: np.ndarray) -> np.ndarray:
+        from scipy.signal import lfilter
+
+        if not len(values):
+            return values
+        # (keys x readings) array, each key's readings left-aligned; NaN padding sits at the end
+        starts = np.r_[0, np.flatnonzero(key[1:] != key[:-1]) + 1]
+        lengths = np.diff(np.r_[starts, len(key)])
+        rows = key[starts]
+        column = np.arange(len(key)) - np.repeat(starts, lengths)
+        grid = np.full((len(rows), lengths.max()), np.nan)
+        grid[np.repeat(np.arange(len(rows)), lengths), column] = values
+
+        a = self.alpha
+        seen = self.count[rows, s]
+        # a key's first reading ever starts its mean; its variance starts at 0
+        mean0 = np.where(seen > 0, self.mean[rows, s], grid[:, 0])
+        var0 = np.where(seen > 0, self.var[rows, s], 0.0)
+
+        # mean_t = a x_t + (1 - a) mean_{t-1}
+        mean = lfilter([a], [1, a - 1], grid, axis=1, zi=((1 - a) * mean0)[:, None])[0]
+        before = np.hstack([mean0[:, None], mean[:, :-1]])
+        deviation = grid - before
+        # var_t = (1 - a) (var_{t-1} + a (x_t - mean_{t-1})^2)
+        var = lfilter([(1 - a) * a], [1, a - 1], deviation ** 2, axis=1, zi=((1 - a) * var0)[:, None])[0]
+        var_before = np.hstack([var0[:, None], var[:, :-1]])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = deviation / np.sqrt(var_before)
+        warm = (seen[:, None] + np.arange(grid.shape[1])) >= self.warmup
+        z = np.where(warm, z, np.nan)
+
+        last = (np.arange(len(rows)), lengths - 1)
+        self.mean[rows, s] = mean[last]
+        self.var[rows, s] = var[last]
+        self.count[rows, s] = seen + lengths
+        return z[np.repeat(np.arange(len(rows)), lengths), column]
+
+    def _add_keys(self, keys: np.ndarray):
+        new = np.setdiff1d(keys, self.keys) if len(self.keys) else keys
+        if not len(new):
+            return
+        merged = np.union1d(self.keys, new) if len(self.keys) else new
+        position = np.searchsorted(merged, self.keys)
+        shape = (len(merged), len(self.sensors))
+        mean, var, count = np.zeros(shape), np.zeros(shape), np.zeros(shape, dtype='int64')
+        mean[position], var[position], count[position] = self.mean, self.var, self.count
+        self.keys, self.mean, self.var, self.count = merged, mean, var, count
+
+
+# scoring a whole history in one call
+def detect_anomalies(df: pd.DataFrame, key: str = 'machineID', alpha: float = ALPHA,
+                     thresholds: dict = THRESHOLDS, warmup: int = WARMUP) -> pd.DataFrame:
+    """Batch mode: a fresh AnomalyDetector run over `df`.
+    **Parameters:df, key ('machineID' or 'model'), alpha, thresholds, warmup
+    **Returns:DataFrame aligned with df, as AnomalyDetector.update
+    """
+    sensors = [c for c in SENSOR_COLS if c in df.columns]
+    return AnomalyDetector(key, alpha, thresholds, warmup, sensors).update(df)
+
+
+# flagged readings of a dataset read chunk by chunk, resumable from an earlier detector
+def scan_anomalies(chunks, detector: AnomalyDetector = None) -> tuple:
+    """Runs `detector` (a new one when None) over an iterable of frames in time order per
+    machine, such as ChunkedDataset.iter_chunks(), keeping only the flagged readings.
+    Passing the detector of an earlier scan continues it over newly appended rows.
+    **Parameters:chunks, detector
+    **Returns:(detector, DataFrame of machineID, datetime and the z-scores of flagged readings)
+    """
+    found = []
+    for chunk in chunks:
+        if detector is None:
+            detector = AnomalyDetector(sensors=[c for c in SENSOR_COLS if c in chunk.columns])
+        scores = detector.update(chunk)
+        flagged = scores['anomaly'].to_numpy()
+        z = scores.loc[flagged, [f'{sensor}_z' for sensor in detector.sensors]]
+        found.append(pd.concat([chunk.loc[flagged, ['machineID', 'datetime']], z], axis=1))
+    return detector, (pd.concat(found, ignore_index=True) if found else pd.DataFrame())
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+# budget per cache in MB, overridable with e.g. SENSORSYNC_CACHE_FIGURES_MB=128;
+# parsed uploads live on disk, so that budget bounds the on-disk size of the cached ones
+# (an evicted store stays until no session holds it)
+BUDGETS_MB = {'parsed': 2048, 'derived': 256, 'figures': 128}
+
+
+# estimated in-memory size of a cached value
+def size_of(value) -> int:
+    """Deep memory usage for pandas objects, `nbytes` for arrays and on-disk datasets,
+    length for bytes, pickled size otherwise.
+    **Parameters:value
+    **Returns:int (bytes)
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+# stable key from the content hash and the parameters that shaped the value
+def cache_key(*parts, **params) -> str:
+    """Hashes positional parts and keyword parameters (sorted by name) into one key.
+    **Parameters:parts, params
+    **Returns:str
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((parts, sorted(params.items()))).encode())
+    return digest.hexdigest()
+
+
+# hashing an uploaded file's bytes without moving its read position
+def content_hash(stream, block_size: int = 1 << 20) -> str:
+    """Returns the blake2b hex digest of a binary file-like object's content.
+    **Parameters:stream, block_size
+    **Returns:str
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    position = stream.tell()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(block_size), b''):
+        digest.update(block)
+    stream.seek(position)
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by an estimated memory budget.
+    Streamlit runs every session in its own thread of one process, so a module-level
+    instance is shared by all sessions. Values are computed outside the cache lock, with
+    a per-key lock so two sessions asking for the same missing key compute it once.
+    """
+
+    def __init__(self, name: str, budget_mb: float, on_evict=None):
+        self.name = name
+        self.budget = int(budget_mb * 1e6)
+        self.on_evict = on_evict
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, size: int = None):
+        size = size_of(value) if size is None else size
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            # always keep the newest entry, even when it alone exceeds the budget
+            while self._size > self.budget and len(self._entries) > 1:
+                _, (old, old_size) = self._entries.popitem(last=False)
+                self._size -= old_size
+                self.evictions += 1
+                evicted.append(old)
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for `key`, calling `compute()` and storing its result on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                # another session may have finished computing it while this one waited
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                self.misses += 1
+            try:
+                value = compute()
+                self.put(key, value)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return value
+
+    def discard(self, key):
+        """Drops `key` without calling `on_evict`, for a value that lives on under another key."""
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            evicted = [value for value, _ in self._entries.values()]
+            self._entries.clear()
+            self._size = 0
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits, 'misses': self.misses,
+                'hit rate (%)': round(100 * self.hits / lookups, 1) if lookups else 0.0,
+                'evictions': self.evictions, 'entries': len(self._entries),
+                'size MB': round(self._size / 1e6, 2), 'budget MB': round(self.budget / 1e6, 2),
+            }
+
+
+# parsed uploads are on-disk stores; an evicted one keeps its files until the last session
+# holding its handle lets go of it, so eviction never deletes a store that is still read
+def _remove_store(dataset):
+    path = getattr(dataset, 'path', None)
+    if path is not None and hasattr(dataset, 'remove'):
+        weakref.finalize(dataset, shutil.rmtree, path, ignore_errors=True)
+
+
+def _budget(name: str) -> float:
+    return float(os.environ.get(f'SENSORSYNC_CACHE_{name.upper()}_MB', BUDGETS_MB[name]))
+
+
+# process-wide caches shared by every Streamlit session
+CACHES = {
+    'parsed': LRUCache('parsed', _budget('parsed'), on_evict=_remove_store),
+    'derived': LRUCache('derived', _budget('derived')),
+    'figures': LRUCache('figures', _budget('figures')),
+}
+
+
+def cache_stats() -> pd.DataFrame:
+    """Hit/miss counters and sizes of every cache, one row per cache."""
+    return pd.DataFrame.from_dict({name: cache.stats() for name, cache in CACHES.items()}, orient='index')
@@ -0,0 +1,83 @@
+import io
+
+import matplotlib
+import seaborn as sns
+from matplotlib.figure import Figure
+
+# render off-screen: figures are turned into PNG bytes for Streamlit and the cache
+matplotlib.use('Agg')
+
+SENSORS = ['volt', 'rotate', 'pressure', 'vibration']
+
+
+# rendering a figure to PNG bytes
+def figure_png(fig, dpi: int = 100) -> bytes:
+    """Saves `fig` as PNG bytes. Figures here are plain matplotlib Figures, never registered
+    with pyplot's process-wide figure manager, so session threads building charts at the same
+    time share no state and nothing has to be closed.
+    **Parameters:fig, dpi
+    **Returns:bytes
+    """
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def failure_count_figure(rollup):
+    """Bar chart of failure counts as a percentage of all rows."""
+    failure_summary = rollup.failure_summary()
+
+    fig = Figure(figsize=(18, 7))
+    ax = fig.subplots()
+    sns.barplot(data=failure_summary, x='Failure Type', y='Percentage (%)', hue='Failure Type', ax=ax)
+    for container in ax.containers:
+        ax.bar_label(container, padding=3)
+    ax.set_ylabel('count')
+    ax.set_yscale('log')
+    ax.set_title('Failure Component Count With Percentage')
+    return fig
+
+
+def age_failure_figure(rollup, bins: int = 3):
+    """Failure rate per failure type in equal-width age buckets."""
+    fig = Figure(figsize=(18, 7))
+    ax = fig.subplots()
+    sns.barplot(data=rollup.age_failure_rates(bins=bins), x='age bucket', y='Failure rate (%)', hue='failure', ax=ax)
+    ax.set_yscale('log')
+    ax.set_title('Failure Probability by Age')
+    return fig
+
+
+def health_profile_figure(rollup):
+    """Box plot of every sensor by machine model, drawn from the quantile sketch."""
+    fig = Figure(figsize=(18, 14))
+    axes = fig.subplots(2, 2)
+    fig.suptitle('Sensor Distribution by Machine Model', fontsize=20)
+
+    present = set(rollup.sketch.index.get_level_values('sensor'))
+    for i, sensor in enumerate(SENSORS):
+        ax = axes[i//2, i%2]
+        if sensor in present:
+            stats = rollup.box_stats(sensor)
+            boxes = ax.bxp(stats, patch_artist=True)
+            for box, color in zip(boxes['boxes'], sns.color_palette('viridis', len(stats))):
+                box.set_facecolor(color)
+        ax.set_title(f'{sensor.capitalize()} Distribution')
+
+    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+    return fig
+
+
+def hourly_trend_figure(rollup):
+    """Mean of every sensor per hour of day."""
+    hourly = rollup.hourly_means()
+    fig = Figure(figsize=(18, 14))
+    axes = fig.subplots(2, 2)
+    fig.suptitle('Multi-sensor Time Series', fontsize=20)
+
+    for i, values in enumerate(hourly.columns):
+        ax = axes[i//2, i%2]
+        sns.lineplot(x=hourly.index, y=hourly[values], ax=ax)
+        ax.set_title(f'{values.capitalize()} Trend By Hour')
+    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+    return fig
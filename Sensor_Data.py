@@ -1,79 +1,198 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# function for checking the null values
-def cleaning(data_csv, data_excel: pd.DataFrame, col:str) -> str:
-    if data_csv is not None:
-        print(f"Print the no of null values: {data_csv.isna().sum()}")
-        print("=======================================================================")
-        print()
-        print(f" {data_csv[data_csv['age'].isna()]}")
-        print()
-        print("========================================================================")
-        print(f"fill the null values using forward fill: {data_csv['age'].ffill(inplace=True)}")
-        print("========================================================================")
-        print()
-        print(f"fill the null values using backward fill: {data_csv['age'].bfill(inplace=True)}")
-        print()
-        print("=======================================================================")
-        print(f"Print the no of null values: {data_csv.isna().sum()}")
-        print()
-
-    elif data_excel is not None:
-        print(f"Print the no of null values: {data_excel.isna().sum()}")
-        print("=======================================================================")
-        print()
-        print(f" {data_excel[data_excel['age'].isna()]}")
-        print()
-        print("========================================================================")
-        print(f"fill the null values using forward fill: {data_excel['age'].ffill(inplace=True)}")
-        print("========================================================================")
-        print()
-        print(f"fill the null values using backward fill: {data_excel['age'].bfill(inplace=True)}")
-        print()
-        print("=======================================================================")
-        print(f"Print the no of null values: {data_excel.isna().sum()}")
-        print()
-
-
-    if data_csv is not None:
-        combine_copy = data_csv.copy()
-        combine_copy['age'].fillna(combine_copy['age'].median(),inplace=True)
-
-    elif data_excel is not None:
-        combine_copy = data_excel.copy()
-        combine_copy['age'].fillna(combine_copy['age'].median(),inplace=True)
 
-# manipulate the date time column
-
-def manipulate_date(df: pd.DataFrame):
-    df['datetime']= pd.to_datetime(df['datetime'])
+# default imputation: age is a machine attribute, so a machine's other rows know it
+IMPUTE_STRATEGIES = {'age': ['ffill', 'bfill', 'median']}
+
+
+class MissingReport:
+    """Missing-value counts of one imputation run, per column: missing before, filled by each
+    strategy in order, and still missing after. Replaces printing whole frames.
+    """
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.before = {}
+        self.filled = {}
+        self.after = {}
+
+    def __repr__(self):
+        cols = ', '.join(f"{col} {self.before[col]}->{self.after[col]}" for col in self.before)
+        return f"MissingReport(rows={self.rows:,}, {cols or 'no missing values'})"
+
+    @property
+    def missing(self) -> int:
+        """Values still missing in the imputed columns."""
+        return sum(self.after.values())
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per imputed column: missing before, filled per strategy, missing after."""
+        frame = pd.DataFrame.from_dict(self.filled, orient='index').fillna(0).astype('int64')
+        frame.insert(0, 'missing', pd.Series(self.before))
+        frame['remaining'] = pd.Series(self.after)
+        frame['remaining (%)'] = (frame['remaining'] / max(self.rows, 1) * 100).round(2)
+        return frame.rename_axis('column')
+
+
+# filling one column with one strategy; group fills follow row order within each group
+def _fill(values: pd.Series, strategy, groups) -> pd.Series:
+    if strategy in ('ffill', 'bfill'):
+        grouped = values.groupby(groups, sort=False) if groups is not None else values
+        return getattr(grouped, strategy)()
+    if strategy == 'median':
+        return values.fillna(values.median())
+    if isinstance(strategy, tuple) and strategy[0] == 'constant':
+        return values.fillna(strategy[1])
+    raise ValueError(f"unknown imputation strategy {strategy!r}")
+
+
+# configurable missing-value imputation
+def impute(df: pd.DataFrame, strategies: dict = IMPUTE_STRATEGIES, group: str = 'machineID',
+           inplace: bool = False) -> tuple:
+    """Fills missing values column by column. Each column takes a strategy or a list tried in
+    order: 'ffill' / 'bfill' (within each `group`, in row order, so sort by machine and time
+    first), 'median', or ('constant', value). Only columns with missing values are touched,
+    and without `inplace` the filled columns go onto a shallow copy.
+    **Parameters:df, strategies (column -> strategy or list), group (None fills across all rows), inplace
+    **Returns:(DataFrame, MissingReport)
+    """
+    out = df if inplace else df.copy(deep=False)
+    report = MissingReport(len(out))
+    groups = out[group] if group is not None and group in out.columns else None
+
+    for col, steps in strategies.items():
+        if col not in out.columns:
+            continue
+        values = out[col]
+        missing = int(values.isna().sum())
+        report.before[col], report.filled[col] = missing, {}
+        for strategy in ([steps] if isinstance(steps, (str, tuple)) else steps):
+            if not missing:
+                break
+            values = _fill(values, strategy, groups)
+            now = int(values.isna().sum())
+            report.filled[col][strategy if isinstance(strategy, str) else strategy[0]] = missing - now
+            missing = now
+        report.after[col] = missing
+        if report.before[col] > missing:
+            out[col] = values
+
+    return out, report
+
+
+# null-value handling of an uploaded CSV or Excel frame
+def cleaning(data_csv, data_excel: pd.DataFrame, col: str = 'age') -> MissingReport:
+    """Imputes `col` of whichever upload is given, in place: forward then backward fill within
+    each machine, then the median for machines with no value at all.
+    **Parameters:data_csv, data_excel, col
+    **Returns:MissingReport
+    """
+    data = data_csv if data_csv is not None else data_excel
+    if data is None:
+        return None
+    _, report = impute(data, {col: IMPUTE_STRATEGIES.get(col, ['ffill', 'bfill', 'median'])}, inplace=True)
+    return report
+
+
+# month labels used across the app, stored as an ordered categorical
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'July', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+MONTH_DTYPE = pd.CategoricalDtype(MONTH_NAMES, ordered=True)
+SENSOR_COLS = ['volt', 'rotate', 'pressure', 'vibration']
+
+
+# deriving year, month, day and hour from one integer view of the datetime
+def calendar_parts(datetime: pd.Series) -> dict:
+    """Splits a datetime64 Series into calendar parts without going through `.dt` four times.
+    Hours and days come from integer division of the epoch seconds; year, month and day are
+    looked up from a small table covering only the days present.
+    **Parameters:datetime
+    **Returns:dict with year, month_num, date, hour arrays and month as an ordered Categorical
+    """
+    seconds = datetime.to_numpy(dtype='datetime64[s]')
+    missing = np.isnat(seconds)
+    hours = seconds.view('int64') // 3600
+    if missing.any():
+        hours = np.where(missing, hours[~missing].min() if not missing.all() else 0, hours)
+
+    days = hours // 24
+    first_day = days.min() if len(days) else 0
+    calendar = np.arange(first_day, days.max() + 1 if len(days) else 0).astype('datetime64[D]')
+    months = calendar.astype('datetime64[M]')
+    month_ticks = months.view('int64')
+    lookup = {
+        'year': (month_ticks // 12 + 1970).astype('int16'),
+        'month_num': (month_ticks % 12 + 1).astype('int8'),
+        'date': ((calendar - months).view('int64') + 1).astype('int8'),
+    }
+
+    offsets = days - first_day
+    parts = {name: table.take(offsets) for name, table in lookup.items()}
+    parts['hour'] = (hours - days * 24).astype('int8')
+    codes = parts['month_num'] - 1
+
+    if missing.any():
+        codes = np.where(missing, -1, codes)
+        parts = {name: np.where(missing, np.nan, values) for name, values in parts.items()}
+
+    parts['month'] = pd.Categorical.from_codes(codes, dtype=MONTH_DTYPE)
+    return parts
+
+
+# single pass cleaning of the age, datetime and sensor columns
+def preprocess(df: pd.DataFrame, inplace: bool = False, fill_age: bool = True) -> pd.DataFrame:
+    """Fills missing age with the median, adds year, month_num, date, hour and month,
+    and rounds every sensor column to 2 decimal places in one block operation.
+    Without `inplace` the input is left untouched but no data is copied: new columns are
+    assigned onto a shallow copy. Without `fill_age` age stays float32 with its gaps, for
+    callers that see the data in chunks and impute it once over all of them.
+    **Parameters:df, inplace, fill_age
+    **Returns:DataFrame
+    """
+    out = df if inplace else df.copy(deep=False)
+
+    if 'age' in out.columns:
+        age = out['age']
+        if not fill_age:
+            out['age'] = age.astype('float32')
+        else:
+            if age.isna().any():
+                age = age.fillna(age.median())
+            out['age'] = age.astype('int16')
+
+    if 'datetime' in out.columns:
+        if not pd.api.types.is_datetime64_any_dtype(out['datetime']):
+            out['datetime'] = pd.to_datetime(out['datetime'])
+        for name, values in calendar_parts(out['datetime']).items():
+            out[name] = values
+
+    sensors = [c for c in SENSOR_COLS if c in out.columns]
+    if sensors:
+        out[sensors] = out[sensors].round(2)
+
+    return out
 
-# separating the the datetime column into year, month, date and hour
-    df['year'] = df['datetime'].dt.year
-    df['month'] = df['datetime'].dt.month
-    df['date'] = df['datetime'].dt.day
-    df['hour'] = df['datetime'].dt.hour
 
-# using dictionary
-    month = {1:'Jan', 2:'Feb', 3:'Mar', 4:'Apr', 5:'May', 6:'Jun',
-            7:'July', 8:'Aug', 9:'Sep', 10:'Oct', 11:'Nov', 12:'Dec'}
+# manipulate the date time column
+def manipulate_date(df: pd.DataFrame):
+    """Adds year, month (name), date and hour in place and casts age to int."""
+    if not pd.api.types.is_datetime64_any_dtype(df['datetime']):
+        df['datetime'] = pd.to_datetime(df['datetime'])
 
-    df['month'] = df['month'].map(month)
+    parts = calendar_parts(df['datetime'])
+    for name in ['year', 'month', 'date', 'hour']:
+        df[name] = parts[name]
 
-# change the age column to int type
     df['age'] = df['age'].astype(int)
 
 
-def round_value(df: pd.DataFrame, col: float) -> float:
-    df[col] = round(df[col], 2)
+def round_value(df: pd.DataFrame, col) -> pd.DataFrame:
+    """Rounds one column, or a list of columns at once, to 2 decimal places in place."""
+    df[col] = df[col].round(2)
 
     return df
 
 
 # values = ['volt','rotate', 'pressure', 'vibration']
-# for i in values:
-#     round_value(df=combine_copy, col=i)
+# round_value(df=combine_copy, col=values)
      
\ No newline at end of file
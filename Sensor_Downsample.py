@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from Sensor_Cache import CACHES
+from Sensor_Data import SENSOR_COLS
+from Sensor_Features import TelemetryGrid
+
+# points drawn per trace, about the pixel width of a chart
+TARGET_POINTS = 1000
+
+
+class TracePyramid:
+    """Min/max pyramid of sensor traces on the telemetry grid (machines x time steps).
+    Level k keeps, for every block of 2**k steps, the minimum and the maximum reading and
+    where they occur. A query picks the coarsest level that still has about `points / 2`
+    blocks in the requested range and returns each block's min and max in time order, so
+    spikes survive and the number of points drawn does not grow with the range.
+    """
+
+    def __init__(self, df: pd.DataFrame, sensors: list = None, freq: str = '1h', grid: TelemetryGrid = None):
+        self.grid = grid or TelemetryGrid(df, freq)
+        self.sensors = [c for c in (sensors or SENSOR_COLS) if c in df.columns]
+        self.raw = {sensor: self.grid.to_grid(df[sensor].to_numpy(), 'float32') for sensor in self.sensors}
+        self.levels = {sensor: _build_levels(values) for sensor, values in self.raw.items()}
+
+    @property
+    def machines(self) -> np.ndarray:
+        return self.grid.machines
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for levels in self.levels.values() for level in levels for array in level)
+
+    def span(self, machine) -> tuple:
+        """First and last reading time of one machine."""
+        row = self._row(machine)
+        present = ~np.isnan(np.stack([values[row] for values in self.raw.values()])).all(axis=0)
+        steps = np.flatnonzero(present)
+        return self._times(steps[[0, -1]]) if len(steps) else (None, None)
+
+    def query(self, machine, start=None, end=None, points: int = TARGET_POINTS) -> dict:
+        """Downsampled traces of one machine between `start` and `end` (inclusive).
+        **Parameters:machine, start, end (timestamps, default the whole grid), points
+        **Returns:dict of sensor -> Series of readings indexed by datetime, at most about `points` long
+        """
+        row = self._row(machine)
+        last = self.grid.shape[1] - 1
+        first_step = 0 if start is None else int(np.clip(self._step(start, np.ceil), 0, last + 1))
+        last_step = last if end is None else int(np.clip(self._step(end, np.floor), -1, last))
+        if last_step < first_step:
+            return {sensor: pd.Series(dtype='float32') for sensor in self.sensors}
+
+        # finest level with at most points / 2 blocks in range; each block gives two points
+        wanted = max(points // 2, 1)
+        level = max(int(np.ceil(np.log2(max((last_step - first_step + 1) / wanted, 1)))), 0)
+
+        traces = {}
+        for sensor, levels in self.levels.items():
+            level = min(level, len(levels) - 1)
+            size = 1 << level
+            first_block, last_block = first_step // size, last_step // size
+            _, low_at, _, high_at = (array[row, first_block:last_block + 1] for array in levels[level])
+            at = np.stack([low_at, high_at], axis=1)
+            # blocks cut by the range edges are re-reduced from the readings inside the range
+            raw = self.raw[sensor][row]
+            for block, lo, hi in [(0, first_step, min((first_block + 1) * size, last_step + 1)),
+                                  (-1, max(last_block * size, first_step), last_step + 1)]:
+                at[block] = lo + _extremes(raw[lo:hi])
+            # each block's two points in time order; at level 0 both are the same reading
+            at = np.sort(at, axis=1).ravel()
+            at = at[np.r_[True, at[1:] != at[:-1]]]
+            values = raw[at]
+            present = ~np.isnan(values)
+            traces[sensor] = pd.Series(values[present], index=pd.DatetimeIndex(self._times(at[present]), name='datetime'),
+                                       name=sensor)
+        return traces
+
+    def _row(self, machine) -> int:
+        row = np.searchsorted(self.grid.machines, machine)
+        if row >= len(self.grid.machines) or self.grid.machines[row] != machine:
+            raise KeyError(machine)
+        return int(row)
+
+    def _step(self, when, rounding) -> float:
+        seconds = pd.Timestamp(when).to_datetime64().astype('datetime64[s]').view('int64')
+        return rounding((seconds - self.grid.start) / self.grid.step_seconds)
+
+    def _times(self, steps: np.ndarray) -> np.ndarray:
+        return (self.grid.start + steps.astype('int64') * self.grid.step_seconds).astype('datetime64[s]')
+
+
+# positions of the smallest and largest reading of a slice (the first one when all are NaN)
+def _extremes(values: np.ndarray) -> np.ndarray:
+    if np.isnan(values).all():
+        return np.zeros(2, dtype='int64')
+    return np.array([np.nanargmin(values), np.nanargmax(values)])
+
+
+# the pyramid of one sensor: level 0 is the grid, each next level halves the time axis
+def _build_levels(values: np.ndarray) -> list:
+    at = np.broadcast_to(np.arange(values.shape[1], dtype='int32'), values.shape)
+    low = np.where(np.isnan(values), np.inf, values).astype('float32')
+    high = np.where(np.isnan(values), -np.inf, values).astype('float32')
+    levels = [(low, at, high, at)]
+
+    while low.shape[1] > 1:
+        low, low_at = _pair_reduce(low, levels[-1][1], np.less_equal, np.inf)
+        high, high_at = _pair_reduce(high, levels[-1][3], np.greater_equal, -np.inf)
+        levels.append((low, low_at, high, high_at))
+    return levels
+
+
+# combining neighbouring blocks two by two, keeping the winner and where it occurred
+def _pair_reduce(values: np.ndarray, at: np.ndarray, keep_left, fill) -> tuple:
+    if values.shape[1] % 2:
+        values = np.pad(values, ((0, 0), (0, 1)), constant_values=fill)
+        at = np.pad(at, ((0, 0), (0, 1)), constant_values=at.max(initial=0))
+    left, right = values[:, 0::2], values[:, 1::2]
+    choose_left = keep_left(left, right)
+    return np.where(choose_left, left, right), np.where(choose_left, at[:, 0::2], at[:, 1::2])
+
+
+# the pyramid of one machine of an ingested dataset, built once per dataset hash
+def machine_pyramid(dataset, machine, freq: str = '1h') -> TracePyramid:
+    """Returns the TracePyramid of one machine of a Sensor_Ingest.ChunkedDataset from the shared
+    'derived' cache, reading only that machine's rows on first use.
+    **Parameters:dataset, machine, freq
+    **Returns:TracePyramid
+    """
+    def build():
+        columns = ['machineID', 'datetime', *[c for c in SENSOR_COLS if c in dataset.columns]]
+        rows = dataset.read(columns, filters=[('machineID', '==', machine)])
+        # rows without a timestamp (machine attribute rows of a stacked export) have no trace
+        rows = rows.dropna(subset=['datetime'])
+        return TracePyramid(rows.sort_values('datetime', ignore_index=True), freq=freq)
+
+    return CACHES['derived'].get_or_compute(('pyramid', dataset.fingerprint(), machine), build)
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+
+from Sensor_Data import SENSOR_COLS
+from Sensor_Join import KEY_COLS
+
+# default windows and lags of the rolling telemetry features
+WINDOWS = ('3h', '24h')
+LAGS = ('1h', '24h')
+STATS = ('mean', 'std', 'min', 'max')
+
+
+class TelemetryGrid:
+    """Telemetry laid out as one (machines x time steps) array per sensor.
+    Readings sit on a regular `freq` grid (the PdM telemetry is hourly), so a time window is
+    a fixed number of columns and every rolling statistic runs along axis 1 for all machines
+    at once, without ever crossing from one machine into the next.
+    """
+
+    def __init__(self, df: pd.DataFrame, freq: str = '1h'):
+        self.freq = pd.Timedelta(freq)
+        self.machines, self.rows_machine = np.unique(df['machineID'].to_numpy(), return_inverse=True)
+
+        ticks = df['datetime'].to_numpy(dtype='datetime64[s]').view('int64')
+        self.start = ticks.min()
+        self.step_seconds = int(self.freq.total_seconds())
+        self.rows_step = (ticks - self.start) // self.step_seconds
+        self.shape = (len(self.machines), int(self.rows_step.max()) + 1)
+        self.rows_flat = self.rows_machine * self.shape[1] + self.rows_step
+        # sorted telemetry without gaps maps row i to grid cell i, so no gather is needed
+        self.dense = (len(self.rows_flat) == self.shape[0] * self.shape[1]
+                      and bool((self.rows_flat == np.arange(len(self.rows_flat))).all()))
+
+    def steps(self, span: str) -> int:
+        """Number of grid columns covered by a time span such as '24h'."""
+        steps, remainder = divmod(pd.Timedelta(span), self.freq)
+        if remainder or steps < 1:
+            raise ValueError(f"{span} is not a positive multiple of the grid frequency {self.freq}")
+        return int(steps)
+
+    def to_grid(self, values: np.ndarray, dtype: str = 'float64') -> np.ndarray:
+        if self.dense:
+            return values.astype(dtype).reshape(self.shape)
+        grid = np.full(self.shape, np.nan, dtype=dtype)
+        grid.ravel()[self.rows_flat] = values
+        return grid
+
+    def to_rows(self, grid: np.ndarray) -> np.ndarray:
+        flat = grid.ravel()
+        return (flat if self.dense else flat.take(self.rows_flat)).astype('float32')
+
+
+# rolling sum of a NaN-padded grid along the time axis
+def _rolling_sum(grid: np.ndarray, window: int) -> np.ndarray:
+    cumulative = np.cumsum(grid, axis=1)
+    out = cumulative.copy()
+    out[:, window:] -= cumulative[:, :-window]
+    return out
+
+
+# sliding min or max in O(n) with van Herk / Gil-Werman block prefix and suffix scans
+def _rolling_extreme(grid: np.ndarray, window: int, op) -> np.ndarray:
+    fill = np.inf if op is np.minimum else -np.inf
+    machines, steps = grid.shape
+    blocks = -(-(steps + window - 1) // window)
+
+    padded = np.full((machines, blocks * window), fill, dtype=grid.dtype)
+    padded[:, window - 1:window - 1 + steps] = np.where(np.isnan(grid), fill, grid)
+    prefix = padded.reshape(machines, blocks, window)
+    suffix = prefix.copy()
+    # scanning position by position keeps every operation on a whole (machines, blocks) slice
+    for j in range(1, window):
+        op(prefix[:, :, j - 1], prefix[:, :, j], out=prefix[:, :, j])
+        op(suffix[:, :, window - j], suffix[:, :, window - j - 1], out=suffix[:, :, window - j - 1])
+
+    prefix, suffix = prefix.reshape(machines, -1), suffix.reshape(machines, -1)
+    out = op(suffix[:, :steps], prefix[:, window - 1:window - 1 + steps])
+    out[np.isinf(out)] = np.nan
+    return out
+
+
+# rolling statistics and lags of every sensor for every machine
+def rolling_features(df: pd.DataFrame, windows=WINDOWS, lags=LAGS, stats=STATS,
+                     freq: str = '1h', grid: TelemetryGrid = None) -> pd.DataFrame:
+    """Per-machine rolling mean, std, min and max over each window in `windows` and the
+    reading `lag` ago for each lag in `lags`, for every sensor present.
+    Windows are trailing and include the current reading; missing readings are skipped.
+    **Parameters:df (preprocessed telemetry), windows, lags, stats, freq, grid (optional, reused)
+    **Returns:DataFrame aligned with df, one float32 column per sensor/statistic/window,
+    e.g. volt_mean_24h or vibration_lag_1h
+    """
+    grid = grid or TelemetryGrid(df, freq)
+    features = {}
+
+    for sensor in [c for c in SENSOR_COLS if c in df.columns]:
+        readings = df[sensor].to_numpy()
+        values = grid.to_grid(readings)
+        # min, max and lags only move values around, so they work on float32
+        values32 = grid.to_grid(readings, 'float32')
+        present = ~np.isnan(values)
+        # centring keeps the sum-of-squares variance numerically stable
+        offset = np.nanmean(values)
+        centred = np.where(present, values - offset, 0.0)
+
+        for window in windows:
+            width = grid.steps(window)
+            count = _rolling_sum(present.astype('float64'), width)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                if 'mean' in stats or 'std' in stats:
+                    total = _rolling_sum(centred, width)
+                    mean = total / count
+                if 'mean' in stats:
+                    features[f'{sensor}_mean_{window}'] = grid.to_rows(mean + offset)
+                if 'std' in stats:
+                    squares = _rolling_sum(centred ** 2, width)
+                    variance = (squares - total * mean) / (count - 1)
+                    # a window holding fewer than two readings has no sample std (as in pandas)
+                    variance = np.where(count > 1, np.clip(variance, 0, None), np.nan)
+                    features[f'{sensor}_std_{window}'] = grid.to_rows(np.sqrt(variance))
+            if 'min' in stats:
+                features[f'{sensor}_min_{window}'] = grid.to_rows(_rolling_extreme(values32, width, np.minimum))
+            if 'max' in stats:
+                features[f'{sensor}_max_{window}'] = grid.to_rows(_rolling_extreme(values32, width, np.maximum))
+
+        for lag in lags:
+            shift = grid.steps(lag)
+            lagged = np.full(values32.shape, np.nan, dtype='float32')
+            lagged[:, shift:] = values32[:, :-shift]
+            features[f'{sensor}_lag_{lag}'] = grid.to_rows(lagged)
+
+    return pd.DataFrame(features, index=df.index)
+
+
+# hours since the last event of each type (error type or maintained component)
+def time_since_events(df: pd.DataFrame, events: pd.DataFrame, col: str, prefix: str,
+                      freq: str = '1h', grid: TelemetryGrid = None) -> pd.DataFrame:
+    """For each value of `col` in `events` (e.g. comp1..comp4 of PdM_maint), the hours from the
+    machine's most recent such event at or before each reading. Events before the first
+    reading count too; readings with no earlier event get NaN.
+    **Parameters:df (telemetry), events, col, prefix (column prefix), freq, grid
+    **Returns:DataFrame aligned with df with one float32 column `<prefix>_<value>` per event type
+    """
+    grid = grid or TelemetryGrid(df, freq)
+    ticks = events['datetime'].to_numpy(dtype='datetime64[s]').view('int64')
+    machine = np.searchsorted(grid.machines, events['machineID'].to_numpy())
+    known = (machine < len(grid.machines)) & (grid.machines[np.minimum(machine, len(grid.machines) - 1)]
+                                              == events['machineID'].to_numpy())
+    # fractional grid position of each event; it marks the first reading at or after it
+    position = (ticks - grid.start) / grid.step_seconds
+    slot = np.clip(np.ceil(position), 0, None).astype('int64')
+    known &= slot < grid.shape[1]
+
+    features = {}
+    steps = np.arange(grid.shape[1])
+    for value in sorted(events[col].dropna().unique()):
+        chosen = known & (events[col] == value).to_numpy()
+        last = np.full(grid.shape, np.nan)
+        # several events in one slot keep the latest; fmax also ignores the NaN fill
+        np.fmax.at(last, (machine[chosen], slot[chosen]), position[chosen])
+        last = np.fmax.accumulate(last, axis=1)
+        features[f'{prefix}_{value}'] = grid.to_rows((steps - last) * grid.step_seconds / 3600)
+
+    return pd.DataFrame(features, index=df.index)
+
+
+# the full feature table used by the failure models
+def build_features(telemetry: pd.DataFrame, errors: pd.DataFrame = None, maint: pd.DataFrame = None,
+                   windows=WINDOWS, lags=LAGS, freq: str = '1h') -> pd.DataFrame:
+    """Rolling sensor features plus hours since the last error of each type and since the
+    last maintenance of each component, keyed on (machineID, datetime).
+    **Parameters:telemetry, errors, maint, windows, lags, freq
+    **Returns:DataFrame with machineID, datetime and the feature columns
+    """
+    grid = TelemetryGrid(telemetry, freq)
+    parts = [telemetry[KEY_COLS], rolling_features(telemetry, windows, lags, grid=grid)]
+    if errors is not None:
+        parts.append(time_since_events(telemetry, errors, 'errorID', 'hours_since', grid=grid))
+    if maint is not None:
+        parts.append(time_since_events(telemetry, maint, 'comp', 'hours_since_maint', grid=grid))
+    return pd.concat(parts, axis=1)
+
+
+# how far back the features of one reading look
+def feature_reach(windows=WINDOWS, lags=LAGS) -> pd.Timedelta:
+    """The widest window or lag: the history a new reading's features depend on."""
+    return max(pd.Timedelta(span) for span in (*windows, *lags))
+
+
+# features of newly appended readings, computed for the affected machines only
+def append_features(context: pd.DataFrame, delta: pd.DataFrame, errors: pd.DataFrame = None,
+                    maint: pd.DataFrame = None, windows=WINDOWS, lags=LAGS, freq: str = '1h') -> pd.DataFrame:
+    """Feature rows of the readings in `delta` alone. `context` holds the stored readings of the
+    same machines from feature_reach() before their first new reading on (it may include the
+    delta itself), so the cost follows the delta and not the whole history.
+    **Parameters:context, delta, errors, maint, windows, lags, freq
+    **Returns:DataFrame like build_features, for the delta readings sorted by machineID and datetime
+    """
+    columns = [c for c in [*KEY_COLS, *SENSOR_COLS] if c in delta.columns]
+    telemetry = pd.concat([context[columns].assign(_new=False), delta[columns].assign(_new=True)],
+                          ignore_index=True)
+    telemetry = telemetry.drop_duplicates(KEY_COLS, keep='last').sort_values(KEY_COLS, ignore_index=True)
+    features = build_features(telemetry, errors, maint, windows, lags, freq)
+    return features[telemetry['_new'].to_numpy()].reset_index(drop=True)
@@ -0,0 +1,461 @@
+import glob
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from Sensor_Data import preprocess
+from Sensor_Join import EVENT_COLS, KEY_COLS, MACHINE_COLS, event_columns
+from Sensor_Loader import CATEGORIES, DATA_DIR, EXPORT_PATTERNS, SCHEMA, file_hash, unify_categories
+
+# rows per chunk; keeps peak memory bounded whatever the upload size
+CHUNK_ROWS = 250_000
+
+# Streamlit holds a browser upload in memory (up to server.maxUploadSize), so exports larger
+# than that are dropped into this server directory and ingested straight from disk
+INGEST_DIR = os.environ.get('SENSORSYNC_INGEST_DIR', DATA_DIR)
+
+# upload schema: age may be missing before preprocess fills it, so it is read as float
+UPLOAD_SCHEMA = dict(SCHEMA, age='float32')
+# calendar columns as nullable integers, so a blank datetime in any chunk is a missing value
+# and every part stores them with the same dtype
+CALENDAR_DTYPES = {'year': 'Int16', 'month_num': 'Int8', 'date': 'Int8', 'hour': 'Int8'}
+# categoricals start from the PdM vocabulary, so a part holding no value of a column still
+# stores a string dictionary; values outside it extend that part's own dictionary, and
+# reading several parts unifies their dictionaries into the store's vocabulary
+CATEGORY_DTYPES = {col: pd.CategoricalDtype(values) for col, values in CATEGORIES.items()}
+
+# per-machine high-water marks and attributes, kept next to the parts of a store
+WATERMARK_FILE = 'watermarks.parquet'
+MACHINE_FILE = 'machines.parquet'
+
+
+# fingerprint of a store extended by one more part; chaining makes an append cost one part hash
+def _chain(fingerprint: str, part: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{fingerprint}:{file_hash(part)}'.encode())
+    return digest.hexdigest()
+
+
+class ChunkedDataset:
+    """Lazy handle on a directory of Parquet parts written by ingest_upload.
+    Nothing is loaded until a method asks for rows, so the handle is cheap to keep in
+    st.session_state.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fingerprint = None
+        # parts hard-linked from the store this one was forked from; their bytes are that store's
+        self._linked = set()
+
+    def __repr__(self):
+        return f"ChunkedDataset({self.path!r}, parts={len(self.parts)})"
+
+    def __len__(self):
+        import pyarrow.parquet as pq
+        return sum(pq.ParquetFile(p).metadata.num_rows for p in self.parts)
+
+    @property
+    def parts(self) -> list:
+        return sorted(glob.glob(os.path.join(self.path, 'part-*.parquet')))
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the stored parts on disk, less the parts shared through fork(), so a fork of
+        a large store counts only what it adds."""
+        return sum(os.path.getsize(p) for p in self.parts if os.path.basename(p) not in self._linked)
+
+    @property
+    def columns(self) -> list:
+        import pyarrow.parquet as pq
+        return pq.read_schema(self.parts[0]).names if self.parts else []
+
+    def iter_chunks(self, columns: list = None):
+        """Yields one DataFrame per stored part, optionally restricted to `columns`."""
+        for part in self.parts:
+            yield pd.read_parquet(part, columns=columns)
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        return next(self.iter_chunks(), pd.DataFrame()).head(n)
+
+    def read(self, columns: list = None, filters: list = None) -> pd.DataFrame:
+        """Materialises the dataset (or just `columns`, or the rows passing pyarrow `filters`)
+        as one DataFrame."""
+        return pd.read_parquet(self.parts, columns=columns, filters=filters)
+
+    def recent(self, since: pd.Series, columns: list = None) -> pd.DataFrame:
+        """Rows of the machines in `since` (machineID -> timestamp) at or after their timestamp.
+        Parquet row-group statistics skip the parts that hold none of those machines.
+        """
+        machines = since.index.tolist()
+        rows = self.read(columns, filters=[('machineID', 'in', machines),
+                                           ('datetime', '>=', since.min())])
+        keep = rows['datetime'].to_numpy() >= since.reindex(rows['machineID']).to_numpy()
+        return rows[keep].reset_index(drop=True)
+
+    @property
+    def dtypes(self) -> pd.Series:
+        """Column dtypes of the stored parts, read from the Parquet schema."""
+        import pyarrow.parquet as pq
+        return pq.read_schema(self.parts[0]).empty_table().to_pandas().dtypes
+
+    def fingerprint(self) -> str:
+        """Content hash of the stored parts, computed once per handle."""
+        if self._fingerprint is None:
+            fingerprint = ''
+            for part in self.parts:
+                fingerprint = _chain(fingerprint, part)
+            self._fingerprint = fingerprint
+        return self._fingerprint
+
+    def watermarks(self) -> pd.Series:
+        """Latest stored reading per machine (machineID -> datetime), read from the store's
+        watermark file or, for stores written without one, scanned from the parts once."""
+        path = os.path.join(self.path, WATERMARK_FILE)
+        if os.path.exists(path):
+            return pd.read_parquet(path)['datetime']
+        marks = _watermarks(self.iter_chunks(KEY_COLS))
+        self._save_watermarks(marks)
+        return marks
+
+    def _save_watermarks(self, marks: pd.Series):
+        path = os.path.join(self.path, WATERMARK_FILE)
+        marks.rename('datetime').to_frame().to_parquet(path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def machines(self) -> pd.DataFrame:
+        """Latest known model and age per machine (indexed by machineID), read from the store's
+        machine file or, the first time, scanned from those columns of the parts."""
+        path = os.path.join(self.path, MACHINE_FILE)
+        if os.path.exists(path):
+            return pd.read_parquet(path)
+        columns = [c for c in MACHINE_COLS if c in self.columns]
+        attrs = _machine_attrs(self.iter_chunks(['machineID', *columns]), columns)
+        self._save_machines(attrs)
+        return attrs
+
+    def _save_machines(self, attrs: pd.DataFrame):
+        path = os.path.join(self.path, MACHINE_FILE)
+        attrs.to_parquet(path + '.tmp')
+        os.replace(path + '.tmp', path)
+
+    def fork(self, store_dir: str = None) -> 'ChunkedDataset':
+        """A new store holding the same parts, hard-linked where the filesystem allows and copied
+        otherwise. Parts are never rewritten, so sharing their files is safe; appending to the
+        fork leaves this store, and every session holding it, untouched.
+        **Parameters:store_dir (defaults to a new temporary directory)
+        **Returns:ChunkedDataset
+        """
+        store_dir = store_dir or tempfile.mkdtemp(prefix='sensorsync-')
+        os.makedirs(store_dir, exist_ok=True)
+        self.watermarks()
+        fork = ChunkedDataset(store_dir)
+        files = self.parts + [os.path.join(self.path, name) for name in (WATERMARK_FILE, MACHINE_FILE)]
+        for path in [path for path in files if os.path.exists(path)]:
+            name = os.path.basename(path)
+            try:
+                os.link(path, os.path.join(store_dir, name))
+                fork._linked.add(name)
+            except OSError:
+                shutil.copy2(path, os.path.join(store_dir, name))
+        fork._fingerprint = self._fingerprint
+        return fork
+
+    def append(self, chunk: pd.DataFrame):
+        """Writes `chunk` as the next part and moves the fingerprint and watermarks forward.
+        The caller is responsible for the chunk matching the stored schema. This changes the
+        store in place: fork() a store that other sessions may hold before appending to it.
+        """
+        marks = self.watermarks()
+        fingerprint = self.fingerprint()
+        last = self.parts[-1] if self.parts else None
+        number = int(os.path.basename(last)[5:10]) + 1 if last else 0
+        part = os.path.join(self.path, f'part-{number:05d}.parquet')
+        chunk.to_parquet(part, index=False)
+
+        self._fingerprint = _chain(fingerprint, part)
+        self._save_watermarks(_watermarks([marks.rename_axis('machineID').reset_index(), chunk]))
+        if os.path.exists(os.path.join(self.path, MACHINE_FILE)):
+            known = self.machines()
+            self._save_machines(_machine_attrs([known.reset_index(), chunk], list(known.columns)))
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+# latest reading per machine over several frames
+def _watermarks(frames) -> pd.Series:
+    latest = [frame.groupby('machineID')['datetime'].max() for frame in frames]
+    latest = [marks for marks in latest if len(marks)]
+    if not latest:
+        return pd.Series(dtype='datetime64[ns]', index=pd.Index([], dtype='int32', name='machineID'),
+                         name='datetime')
+    return pd.concat(latest).groupby(level=0).max()
+
+
+# latest known attributes per machine over several frames
+def _machine_attrs(frames, columns: list) -> pd.DataFrame:
+    latest = [frame.groupby('machineID', observed=True)[columns].last() for frame in frames]
+    latest = [attrs for attrs in latest if len(attrs)]
+    if not latest:
+        return pd.DataFrame(columns=columns, index=pd.Index([], dtype='int32', name='machineID'))
+    attrs = pd.concat(unify_categories(latest)) if len(latest) > 1 else latest[0]
+    return attrs.groupby(level=0).last()
+
+
+# stream size, used to turn the read position into a progress fraction
+def _stream_size(stream) -> int:
+    if getattr(stream, 'size', None):
+        return stream.size
+    position = stream.tell()
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    return size
+
+
+# reading a CSV upload in chunks
+def _csv_chunks(stream, chunk_rows: int):
+    total = max(_stream_size(stream), 1)
+    header = pd.read_csv(stream, nrows=0).columns
+    stream.seek(0)
+
+    dtypes = {c: UPLOAD_SCHEMA[c] for c in header if c in UPLOAD_SCHEMA}
+    with pd.read_csv(stream, dtype=dtypes, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield chunk, min(stream.tell() / total, 1.0)
+
+
+# reading the first sheet of an Excel upload in chunks with openpyxl's streaming mode
+def _excel_chunks(stream, chunk_rows: int):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        total = max((sheet.max_row or 1) - 1, 1)
+        rows = sheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        dtypes = {c: UPLOAD_SCHEMA[c] for c in header if c in UPLOAD_SCHEMA}
+
+        batch, done = [], 0
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_rows:
+                done += len(batch)
+                yield pd.DataFrame(batch, columns=header).astype(dtypes), min(done / total, 1.0)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header).astype(dtypes), 1.0
+    finally:
+        workbook.close()
+
+
+# categorical columns of a chunk on CATEGORY_DTYPES, extended by any other value they hold
+def _pin_categories(chunk: pd.DataFrame) -> pd.DataFrame:
+    pinned = {}
+    for col, dtype in CATEGORY_DTYPES.items():
+        if col not in chunk.columns:
+            continue
+        # Excel cells may hold numbers; the dictionary is always strings
+        values = chunk[col].astype('category').cat.rename_categories(str)
+        extra = sorted(set(values.cat.categories) - set(dtype.categories))
+        pinned[col] = values.astype(pd.CategoricalDtype([*dtype.categories, *extra]) if extra else dtype)
+    return chunk.assign(**pinned) if pinned else chunk
+
+
+# one preprocessed chunk as it is stored: age left for imputation over the whole store,
+# calendar columns nullable and categoricals pinned
+def _prepare(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = preprocess(chunk, inplace=True, fill_age=False)
+    chunk = chunk.astype({c: t for c, t in CALENDAR_DTYPES.items() if c in chunk.columns})
+    return _pin_categories(chunk)
+
+
+# median of the ages counted per value across chunks
+def _median(counts: list) -> float:
+    counts = pd.concat(counts).groupby(level=0).sum().sort_index() if counts else pd.Series(dtype='int64')
+    if counts.empty:
+        return np.nan
+    cumulative = counts.cumsum().to_numpy()
+    total = cumulative[-1]
+    middle = np.searchsorted(cumulative, [(total + 1) // 2, total // 2 + 1])
+    return float(counts.index[middle].to_numpy().mean())
+
+
+# imputing age over the whole store the way Sensor_Data.impute does over one frame
+def _fill_age(dataset: ChunkedDataset, known: list, counts: list, gaps: set):
+    """Forward then backward fill within each machine in row order across all parts, then
+    the median of every known age; only the parts in `gaps` (those with a missing age) are
+    rewritten. `known` holds the first and last known age per machine of each part, or is
+    empty when the upload has no machineID.
+    """
+    median = _median(counts)
+    first = pd.concat([k['first'] for k in known]).dropna() if known else pd.Series(dtype='float32')
+    first = first[~first.index.duplicated()]
+    carry = pd.Series(dtype='float32')
+    for number, part in enumerate(dataset.parts):
+        if number in gaps:
+            chunk = pd.read_parquet(part)
+            age = chunk['age']
+            if known:
+                ids = chunk['machineID']
+                age = age.groupby(ids, sort=False).ffill()
+                # earlier parts carry the forward fill over, the machine's first age the backward one
+                for fallback in (carry, first):
+                    age = age.fillna(pd.Series(fallback.reindex(ids).to_numpy(), index=age.index))
+            chunk['age'] = age.fillna(median).astype('float32')
+            chunk.to_parquet(part + '.tmp', index=False)
+            os.replace(part + '.tmp', part)
+        if known:
+            last = known[number]['last'].dropna()
+            carry = last.combine_first(carry) if len(carry) else last
+
+
+# exports waiting on the server for ingest
+def server_exports(directory: str = INGEST_DIR) -> list:
+    """CSV and Excel files in `directory`, sorted by name, for ingest_upload to read from disk.
+    **Parameters:directory
+    **Returns:list of paths
+    """
+    return sorted(p for pattern in EXPORT_PATTERNS for p in glob.glob(os.path.join(directory, pattern)))
+
+
+# streaming an upload through preprocess into an on-disk columnar store
+def ingest_upload(source, name: str, store_dir: str = None, chunk_rows: int = CHUNK_ROWS,
+                  progress=None) -> ChunkedDataset:
+    """Reads a CSV or Excel upload in chunks of `chunk_rows`, runs Sensor_Data.preprocess on
+    each chunk and appends it as a Parquet part, so only one chunk is in memory at a time.
+    That bound holds for a path; a browser upload is already whole in memory (Streamlit's
+    UploadedFile), so multi-GB exports go through server_exports instead.
+    Age is stored as float32 and imputed once over the whole store (see _fill_age), so the
+    result does not depend on `chunk_rows`; calendar columns are nullable integers.
+    Categorical columns are stored on Sensor_Loader.CATEGORIES plus whatever other values
+    the upload holds.
+    **Parameters:source (path or binary file-like), name (file name, picks the parser),
+    store_dir (defaults to a new temporary directory), chunk_rows,
+    progress (optional callable taking the fraction done and the rows written so far)
+    **Returns:ChunkedDataset
+    """
+    created = store_dir is None
+    store_dir = store_dir or tempfile.mkdtemp(prefix='sensorsync-')
+    os.makedirs(store_dir, exist_ok=True)
+
+    stream = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    chunks = _csv_chunks if name.lower().endswith('.csv') else _excel_chunks
+
+    rows, dtypes, latest = 0, None, []
+    known, counts, gaps = [], [], set()
+    try:
+        for number, (chunk, fraction) in enumerate(chunks(stream, chunk_rows)):
+            chunk = _prepare(chunk)
+            # later chunks follow the first chunk's dtypes so every part shares one schema
+            if dtypes is None:
+                dtypes = {c: t for c, t in chunk.dtypes.items() if t != 'category'}
+            else:
+                chunk = chunk.astype({c: t for c, t in dtypes.items() if chunk[c].dtype != t})
+
+            chunk.to_parquet(os.path.join(store_dir, f'part-{number:05d}.parquet'), index=False)
+            if 'machineID' in chunk.columns and 'datetime' in chunk.columns:
+                latest.append(chunk.groupby('machineID')['datetime'].max())
+            if 'age' in chunk.columns:
+                counts.append(chunk['age'].value_counts())
+                if chunk['age'].isna().any():
+                    gaps.add(number)
+                if 'machineID' in chunk.columns:
+                    known.append(chunk.groupby('machineID')['age'].agg(['first', 'last']))
+            rows += len(chunk)
+            if progress is not None:
+                progress(fraction, rows)
+    except BaseException:
+        # a half-written store is never handed out
+        if created:
+            shutil.rmtree(store_dir, ignore_errors=True)
+        raise
+    finally:
+        if stream is not source:
+            stream.close()
+
+    dataset = ChunkedDataset(store_dir)
+    if gaps:
+        _fill_age(dataset, known, counts, gaps)
+    if latest:
+        dataset._save_watermarks(_watermarks([marks.reset_index() for marks in latest]))
+    return dataset
+
+
+# a delta chunk given the stored columns it can leave out
+def _complete(chunk: pd.DataFrame, stored: pd.Series, dataset: ChunkedDataset) -> pd.DataFrame:
+    """Plants push hourly telemetry without the event and machine columns of the joined
+    layout: events a delta does not mention did not happen (indicators False, event columns
+    missing), and model and age are filled per machine from the store where the delta lacks them.
+    """
+    absent = [c for c in stored.index if c not in chunk.columns]
+    filled = {}
+    for col in EVENT_COLS.values():
+        for c in event_columns(absent, col):
+            filled[c] = pd.Series(False if stored[c] == bool else np.nan, index=chunk.index, dtype=stored[c])
+    wanted = [c for c in MACHINE_COLS if c in stored.index and (c in absent or chunk[c].isna().any())]
+    if wanted and 'machineID' in chunk.columns:
+        known = dataset.machines().reindex(chunk['machineID'].to_numpy())
+        for c in wanted:
+            values = pd.Series(known[c].to_numpy(dtype=object), index=chunk.index)
+            filled[c] = values if c in absent else chunk[c].astype(object).fillna(values)
+        if 'age' in filled:
+            filled['age'] = filled['age'].astype('float32')
+    return _pin_categories(chunk.assign(**filled)) if filled else chunk
+
+
+# appending an hourly delta to an existing store
+def append_upload(dataset: ChunkedDataset, source, name: str, chunk_rows: int = CHUNK_ROWS,
+                  progress=None) -> pd.DataFrame:
+    """Reads a CSV or Excel delta in chunks, preprocesses it, and appends only the readings
+    newer than each machine's high-water mark. The work is proportional to the delta: the
+    history is never re-read. Readings at or before a machine's watermark (re-sent or late)
+    are dropped, so of several copies of one (machineID, datetime) the last wins within a
+    chunk but the first across chunks. A telemetry-only delta is completed by _complete;
+    a stored column it cannot fill (a sensor, say) raises ValueError.
+    `dataset` is extended in place, so pass a fork() of a store that is shared.
+    **Parameters:dataset, source (path or binary file-like), name, chunk_rows,
+    progress (optional callable taking the fraction done and the rows appended so far)
+    **Returns:DataFrame of the appended rows, for updating the derived data
+    """
+    stored = dataset.dtypes
+    stream = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    chunks = _csv_chunks if name.lower().endswith('.csv') else _excel_chunks
+
+    appended, rows = [], 0
+    try:
+        for chunk, fraction in chunks(stream, chunk_rows):
+            chunk = _complete(_prepare(chunk), stored, dataset)
+            missing = set(stored.index) - set(chunk.columns)
+            if missing:
+                raise ValueError(f"{name} is missing the stored columns {sorted(missing)}")
+            chunk = chunk[stored.index]
+            chunk = chunk.drop_duplicates(KEY_COLS, keep='last')
+            marks = dataset.watermarks()
+            since = marks.reindex(chunk['machineID'].to_numpy()).to_numpy()
+            chunk = chunk[~(chunk['datetime'].to_numpy() <= since)]
+            if chunk.empty:
+                continue
+
+            chunk = chunk.sort_values(KEY_COLS, ignore_index=True)
+            chunk = chunk.astype({c: t for c, t in stored.items()
+                                  if t != 'category' and chunk[c].dtype != t})
+            dataset.append(chunk)
+            appended.append(chunk)
+            rows += len(chunk)
+            if progress is not None:
+                progress(fraction, rows)
+    finally:
+        if stream is not source:
+            stream.close()
+
+    if not appended:
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in stored.items()})
+    # every chunk has the stored dtypes and the pinned categories; other categoricals get one
+    # dictionary, so no all-missing column of a quiet chunk decides the concatenated dtype
+    return pd.concat(unify_categories(appended), ignore_index=True)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# columns shared by every PdM table and the telemetry sensor columns
+KEY_COLS = ['machineID', 'datetime']
+SENSOR_COLS = ['volt', 'rotate', 'pressure', 'vibration']
+
+# event table name -> the categorical column it carries
+EVENT_COLS = {'errors': 'errorID', 'failures': 'failure', 'maint': 'comp'}
+MACHINE_COLS = ['model', 'age']
+
+
+# casting the join keys to one dtype on every table
+def typed_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Returns `df` with machineID as int32 and datetime as datetime64.
+    **Parameters:df
+    **Returns:DataFrame (the input frame is not modified)
+    """
+    datetime = df['datetime']
+    if not pd.api.types.is_datetime64_any_dtype(datetime):
+        datetime = pd.to_datetime(datetime)
+    return df.assign(machineID=df['machineID'].astype('int32'), datetime=datetime)
+
+
+# attaching one event table (errors, failures or maint) to the telemetry rows
+def event_indicators(telemetry: pd.DataFrame, events: pd.DataFrame, col: str,
+                     tolerance: pd.Timedelta) -> pd.DataFrame:
+    """Sorted as-of join of an event table onto telemetry that is already sorted by datetime.
+    Each event is attached to the first reading of the same machine at or after it, within `tolerance`.
+    Every event is kept: events that share a reading (two components replaced in one visit,
+    two errors in one hour) each set their own indicator on it.
+    **Parameters:telemetry, events, col, tolerance
+    **Returns:bool DataFrame aligned with telemetry, one column `<col>_<value>` per event value
+    """
+    events = typed_keys(events[KEY_COLS + [col]]).dropna(subset=[col])
+    values = pd.Categorical(events[col])
+    events = events[KEY_COLS].assign(code=values.codes).sort_values('datetime', kind='mergesort')
+
+    readings = telemetry[KEY_COLS].assign(row=np.arange(len(telemetry)))
+    merged = pd.merge_asof(events, readings, on='datetime', by='machineID',
+                           tolerance=tolerance, direction='forward', allow_exact_matches=True)
+    attached = merged['row'].notna().to_numpy()
+
+    flags = np.zeros((len(telemetry), len(values.categories)), dtype=bool)
+    flags[merged['row'].to_numpy()[attached].astype('int64'), merged['code'].to_numpy()[attached]] = True
+    return pd.DataFrame(flags, index=telemetry.index, columns=[f'{col}_{v}' for v in values.categories])
+
+
+# the columns of a joined frame that describe one event column
+def event_columns(columns, col: str) -> list:
+    """`col` itself and its `<col>_<value>` indicator columns, whichever of them `columns` holds."""
+    return [c for c in columns if c == col or c.startswith(f'{col}_')]
+
+
+# per-value indicators of one event column, whichever layout a frame uses
+def event_flags(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Whether each row carries each event value: read from the `<col>_<value>` columns that
+    join_pdm writes, or derived from a single categorical `col` (one event per row, as in the
+    row-stacked notebook exports).
+    **Parameters:df, col ('errorID', 'failure' or 'comp')
+    **Returns:bool DataFrame aligned with df with one column per event value, None when df has neither
+    """
+    prefix = f'{col}_'
+    indicators = [c for c in df.columns if c.startswith(prefix)]
+    if indicators:
+        return df[indicators].fillna(False).astype(bool).rename(columns=lambda c: c[len(prefix):])
+    if col not in df.columns:
+        return None
+
+    values = pd.Categorical(df[col])
+    flags = np.zeros((len(df), len(values.categories)), dtype=bool)
+    rows = np.flatnonzero(values.codes >= 0)
+    flags[rows, values.codes[rows]] = True
+    return pd.DataFrame(flags, index=df.index, columns=values.categories.astype(str))
+
+
+# broadcasting the static machine attributes onto every reading
+def broadcast_machines(telemetry: pd.DataFrame, machines: pd.DataFrame) -> pd.DataFrame:
+    """One-time lookup of the `PdM_machines` attributes (model, age) for each telemetry row.
+    **Parameters:telemetry, machines
+    **Returns:DataFrame aligned with telemetry holding the machine columns
+    """
+    machines = machines.drop_duplicates('machineID', keep='last')
+    attrs = machines.set_index(machines['machineID'].astype('int32'))[MACHINE_COLS]
+    dtypes = {'model': 'category'}
+    if attrs['age'].notna().all():
+        dtypes['age'] = 'int16'
+    attrs = attrs.astype(dtypes)
+
+    looked_up = attrs.reindex(telemetry['machineID'])
+    return pd.DataFrame({c: looked_up[c].array for c in MACHINE_COLS}, index=telemetry.index)
+
+
+# joining the five PdM tables into one dense frame
+def join_pdm(telemetry: pd.DataFrame, errors: pd.DataFrame, failures: pd.DataFrame,
+             maint: pd.DataFrame, machines: pd.DataFrame, freq: str = '1h') -> pd.DataFrame:
+    """Builds one row per telemetry reading keyed on (machineID, datetime), replacing the
+    row-stacking `pd.concat` of the five tables.
+    Errors, failures and maintenance are attached with sorted as-of joins: an event lands on the
+    reading of the same machine at or after it, inside one reading interval `freq`, as one
+    indicator column per event value so simultaneous events are all kept.
+    Machine attributes are broadcast onto every reading.
+    **Parameters:telemetry, errors, failures, maint, machines, freq
+    **Returns:DataFrame sorted by machineID and datetime with float32 sensors, int32 machineID,
+    bool errorID_<value>/failure_<value>/comp_<value> indicators and categorical model
+    """
+    # (t - freq, t]: inclusive tolerance one nanosecond short of a full interval
+    tolerance = pd.Timedelta(freq) - pd.Timedelta(1, 'ns')
+
+    sensors = [c for c in SENSOR_COLS if c in telemetry.columns]
+    joined = typed_keys(telemetry[KEY_COLS + sensors])
+    joined = joined.astype({c: 'float32' for c in sensors})
+    joined = joined.drop_duplicates(KEY_COLS, keep='last')
+    joined = joined.sort_values(['datetime', 'machineID'], kind='mergesort', ignore_index=True)
+
+    tables = {'errors': errors, 'failures': failures, 'maint': maint}
+    for name, col in EVENT_COLS.items():
+        indicators = event_indicators(joined, tables[name], col, tolerance)
+        for column in indicators.columns:
+            joined[column] = indicators[column]
+
+    attrs = broadcast_machines(joined, machines)
+    for col in MACHINE_COLS:
+        joined[col] = attrs[col]
+
+    return joined.sort_values(KEY_COLS, kind='mergesort', ignore_index=True)
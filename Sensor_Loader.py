@@ -0,0 +1,248 @@
+import glob
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from Sensor_Data import IMPUTE_STRATEGIES, impute
+
+# the five Azure PdM tables shipped in Dataset/
+TABLES = ['errors', 'failures', 'machines', 'maint', 'telemetry']
+DATA_DIR = 'Dataset'
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+
+# every PdM timestamp is written as e.g. 2015-01-01 06:00:00
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# explicit schema per column so nothing is left to dtype inference
+SCHEMA = {
+    'machineID': 'int32',
+    'volt': 'float32',
+    'rotate': 'float32',
+    'pressure': 'float32',
+    'vibration': 'float32',
+    'age': 'int16',
+    'model': 'category',
+    'errorID': 'category',
+    'comp': 'category',
+    'failure': 'category',
+}
+
+# the values each categorical column takes in the Azure PdM set
+COMPONENTS = ['comp1', 'comp2', 'comp3', 'comp4']
+CATEGORIES = {
+    'model': ['model1', 'model2', 'model3', 'model4'],
+    'errorID': ['error1', 'error2', 'error3', 'error4', 'error5'],
+    'comp': COMPONENTS,
+    'failure': COMPONENTS,
+}
+
+# file types of a directory of exports (one file per plant or month)
+EXPORT_PATTERNS = ('*.csv', '*.xlsx')
+# exports may leave age blank, so it is read as float and imputed once every file is in
+EXPORT_SCHEMA = dict(SCHEMA, age='float32')
+
+CACHE_FORMATS = {
+    'parquet': ('.parquet', pd.read_parquet, 'to_parquet'),
+    'feather': ('.feather', pd.read_feather, 'to_feather'),
+}
+
+
+# hashing the raw file so an edited CSV never hits a stale cache
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """Returns the blake2b hex digest of the file content.
+    **Parameters:path, block_size
+    **Returns:str
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# reading one CSV with the explicit schema
+def read_typed_csv(source, schema: dict = SCHEMA) -> pd.DataFrame:
+    """Parses a PdM CSV (path or file-like) with the dtypes in `schema` and a fixed datetime
+    format. Columns not listed in `schema` keep pandas' default inference.
+    **Parameters:source, schema
+    **Returns:DataFrame
+    """
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+    dtypes = {c: schema[c] for c in header if c in schema}
+    if 'datetime' in header:
+        dtypes['datetime'] = 'str'
+    df = pd.read_csv(source, dtype=dtypes)
+
+    if 'datetime' in df.columns:
+        df['datetime'] = pd.to_datetime(df['datetime'], format=DATETIME_FORMAT)
+    return df
+
+
+# reading one Excel sheet with the explicit schema
+def read_excel_sheet(path: str, sheet=0, schema: dict = SCHEMA) -> pd.DataFrame:
+    """Parses one sheet (index or name) of a PdM Excel export with openpyxl's streaming reader,
+    which is much faster than pd.read_excel, and applies the dtypes in `schema`.
+    **Parameters:path, sheet, schema
+    **Returns:DataFrame
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        rows = worksheet.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        df = pd.DataFrame(rows, columns=header)
+    finally:
+        workbook.close()
+
+    df = df.astype({c: schema[c] for c in df.columns if c in schema})
+    if 'datetime' in df.columns:
+        df['datetime'] = pd.to_datetime(df['datetime'], format=DATETIME_FORMAT)
+    return df
+
+
+def excel_sheets(path: str) -> list:
+    """Sheet names of an Excel file, read without loading the sheets."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+# one unit of parallel work: a CSV file or one sheet of an Excel file
+def _read_export(task: tuple) -> pd.DataFrame:
+    path, sheet, schema = task
+    return read_typed_csv(path, schema) if sheet is None else read_excel_sheet(path, sheet, schema)
+
+
+# giving every categorical column the same dictionary across frames
+def unify_categories(frames: list) -> list:
+    """Re-codes each categorical column of `frames` against the sorted union of its
+    categories, so the frames concatenate into a categorical column instead of object, and
+    the codes do not depend on which file was read first.
+    **Parameters:frames
+    **Returns:list of DataFrames
+    """
+    columns = {c for df in frames for c, t in df.dtypes.items() if isinstance(t, pd.CategoricalDtype)}
+    categories = {}
+    for col in columns:
+        # a column with one dtype in every frame (e.g. the ordered month) already concatenates
+        if len({df[col].dtype if col in df.columns else None for df in frames}) == 1:
+            continue
+        present = [df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype('category')
+                   for df in frames if col in df.columns]
+        categories[col] = union_categoricals(present, sort_categories=True).categories
+    return [df.assign(**{col: df[col].astype(pd.CategoricalDtype(cats)) for col, cats in categories.items()
+                         if col in df.columns})
+            for df in frames]
+
+
+# reading many exports concurrently
+def read_exports(paths: list, max_workers: int = None, executor: str = 'process',
+                 schema: dict = SCHEMA) -> pd.DataFrame:
+    """Reads CSV files and every sheet of Excel files across a pool (one worker per CPU by
+    default) and concatenates them in path and sheet order with unified categories.
+    Parsing holds the GIL, so processes scale where threads do not; 'thread' avoids pickling
+    the results when workers are few.
+    **Parameters:paths, max_workers, executor ('process' or 'thread'), schema
+    **Returns:DataFrame
+    """
+    tasks = []
+    for path in paths:
+        if path.lower().endswith('.csv'):
+            tasks.append((path, None, schema))
+        else:
+            tasks.extend((path, sheet, schema) for sheet in excel_sheets(path))
+    if not tasks:
+        return pd.DataFrame()
+
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        frames = [_read_export(task) for task in tasks]
+    else:
+        pool = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with pool(max_workers=workers) as pool:
+            frames = list(pool.map(_read_export, tasks))
+    return pd.concat(unify_categories(frames), ignore_index=True)
+
+
+# loading a directory drop of exports
+def load_directory(directory: str, patterns=EXPORT_PATTERNS, max_workers: int = None,
+                   executor: str = 'process') -> pd.DataFrame:
+    """Reads every file matching `patterns` in `directory` (sorted by name) with read_exports.
+    Age is read as float so blank ages parse; they are imputed across all the files with
+    Sensor_Data.IMPUTE_STRATEGIES and age is cast back to its SCHEMA dtype once none is left.
+    **Parameters:directory, patterns, max_workers, executor
+    **Returns:DataFrame
+    """
+    paths = sorted(p for pattern in patterns for p in glob.glob(os.path.join(directory, pattern)))
+    df = read_exports(paths, max_workers, executor, EXPORT_SCHEMA)
+    if 'age' in df.columns:
+        df, report = impute(df, {'age': IMPUTE_STRATEGIES['age']}, inplace=True)
+        if not report.missing:
+            df['age'] = df['age'].astype(SCHEMA['age'])
+    return df
+
+
+# loading one table through the on-disk columnar cache
+def load_table(path: str, cache_dir: str = CACHE_DIR, fmt: str = 'parquet') -> pd.DataFrame:
+    """Reads the columnar cache of `path` when one exists for the current file content,
+    otherwise parses the CSV with read_typed_csv and writes the cache for next time.
+    **Parameters:path, cache_dir (None disables the cache), fmt ('parquet' or 'feather')
+    **Returns:DataFrame
+    """
+    if cache_dir is None:
+        return read_typed_csv(path)
+
+    suffix, reader, writer = CACHE_FORMATS[fmt]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f'{stem}-{file_hash(path)}{suffix}')
+
+    if os.path.exists(cache_path):
+        return reader(cache_path)
+
+    df = read_typed_csv(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # write then rename so a crashed write never leaves a half file behind
+    tmp_path = cache_path + '.tmp'
+    getattr(df, writer)(tmp_path)
+    os.replace(tmp_path, cache_path)
+    return df
+
+
+# loading all five PdM tables
+def load_pdm(data_dir: str = DATA_DIR, cache_dir: str = CACHE_DIR, fmt: str = 'parquet',
+             max_workers: int = None) -> dict:
+    """Loads every `PdM_<table>.csv` in `data_dir` through load_table, the tables concurrently
+    on a thread pool so the small tables load while the telemetry parses.
+    **Parameters:data_dir, cache_dir, fmt, max_workers (1 loads them one after another)
+    **Returns:dict of table name -> DataFrame
+    """
+    paths = [os.path.join(data_dir, f'PdM_{name}.csv') for name in TABLES]
+    with ThreadPoolExecutor(max_workers=max_workers or len(TABLES)) as pool:
+        tables = pool.map(load_table, paths, [cache_dir] * len(paths), [fmt] * len(paths))
+        return dict(zip(TABLES, tables))
+
+
+# memory footprint per table
+def memory_report(tables: dict) -> pd.DataFrame:
+    """Summarises rows and deep memory usage of each loaded table.
+    **Parameters:tables (dict of name -> DataFrame)
+    **Returns:DataFrame with rows, memory_mb and bytes_per_row per table
+    """
+    report = pd.DataFrame({
+        'rows': {name: len(df) for name, df in tables.items()},
+        'memory_mb': {name: df.memory_usage(deep=True).sum() / 1e6 for name, df in tables.items()},
+    })
+    report['bytes_per_row'] = (report['memory_mb'] * 1e6 / report['rows'].clip(lower=1)).round(1)
+    return report
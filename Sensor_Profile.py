@@ -0,0 +1,114 @@
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import deque
+
+import pandas as pd
+
+# instrumentation is on when the app starts with SENSORSYNC_PROFILE=1; the sidebar can flip it
+PROFILE_DEFAULT = os.environ.get('SENSORSYNC_PROFILE', '0') == '1'
+# optional JSON-lines file every record is appended to, for comparing runs offline
+PROFILE_LOG = os.environ.get('SENSORSYNC_PROFILE_LOG')
+# records kept in memory per session
+HISTORY = 5000
+
+
+# peak resident memory of this process so far, in MB (None where resource is unavailable)
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+class Profiler:
+    """Wall time, rows processed and peak memory of named stages, grouped by rerun.
+    While disabled, stage() does nothing, so instrumented code runs at full speed.
+    Peak memory is the process-wide peak RSS, so a stage's growth shows whether it
+    raised the high-water mark.
+    """
+
+    def __init__(self, enabled: bool = PROFILE_DEFAULT, log_path: str = PROFILE_LOG, history: int = HISTORY):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.records = deque(maxlen=history)
+        self.run = 0
+        self._stack = []
+        self._run_start = None
+
+    def start_run(self):
+        """Marks the start of a rerun; later records belong to it."""
+        self.run += 1
+        self._run_start = (time.perf_counter(), peak_rss_mb())
+
+    def end_run(self, rows: int = None):
+        """Records the whole rerun as the `rerun` stage."""
+        if not self.enabled or self._run_start is None:
+            return
+        start, peak_before = self._run_start
+        self._write('rerun', time.perf_counter() - start, rows, peak_before)
+        self._run_start = None
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: int = None):
+        """Times the enclosed block. Nested stages are recorded as `outer/inner`; the yielded
+        dict takes a `rows` count known only at the end, e.g. `info['rows'] = len(df)`.
+        """
+        if not self.enabled:
+            yield {}
+            return
+
+        info = {'rows': rows}
+        self._stack.append(name)
+        path = '/'.join(self._stack)
+        peak_before = peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self._stack.pop()
+            self._write(path, time.perf_counter() - start, info.get('rows'), peak_before)
+
+    def _write(self, stage: str, seconds: float, rows, peak_before):
+        peak = peak_rss_mb()
+        self.record({
+            'run': self.run, 'stage': stage, 'seconds': round(seconds, 6), 'rows': rows,
+            'peak_rss_mb': None if peak is None else round(peak, 1),
+            'peak_growth_mb': None if peak is None else round(peak - peak_before, 1),
+            'time': time.time(),
+        })
+
+    def record(self, entry: dict):
+        self.records.append(entry)
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def frame(self, run: int = None) -> pd.DataFrame:
+        """Records as a DataFrame, optionally only those of one run."""
+        records = [r for r in self.records if run is None or r['run'] == run]
+        return pd.DataFrame(records, columns=['run', 'stage', 'seconds', 'rows', 'peak_rss_mb',
+                                              'peak_growth_mb', 'time'])
+
+    def summary(self) -> pd.DataFrame:
+        """Per stage across runs: calls, mean, max and total seconds, rows per second."""
+        df = self.frame()
+        if df.empty:
+            return df
+        grouped = df.groupby('stage', sort=False)
+        summary = grouped['seconds'].agg(calls='count', mean='mean', max='max', total='sum')
+        rows = grouped['rows'].sum(min_count=1)
+        summary['rows/s'] = (rows / summary['total']).round(0)
+        return summary.sort_values('total', ascending=False)
+
+    def to_jsonl(self) -> str:
+        """Every record as JSON lines."""
+        return ''.join(json.dumps(r) + '\n' for r in self.records)
+
+    def clear(self):
+        self.records.clear()
@@ -0,0 +1,230 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from Sensor_Data import SENSOR_COLS
+from Sensor_Join import event_flags
+from Sensor_Cache import CACHES
+from Sensor_Loader import CACHE_DIR
+
+ROLLUP_DIR = os.path.join(CACHE_DIR, 'rollups')
+
+# relative accuracy of the quantile sketch: every quantile is within 0.5% of the exact value
+SKETCH_ALPHA = 0.005
+SKETCH_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+LOG_GAMMA = np.log(SKETCH_GAMMA)
+
+# mapping sensor readings to log-spaced sketch buckets
+def sketch_buckets(values: np.ndarray) -> tuple:
+    """Assigns each reading to a bucket of a relative-error quantile sketch (DDSketch style):
+    bucket k holds magnitudes in (gamma**(k-1), gamma**k], so buckets merge by adding counts.
+    **Parameters:values
+    **Returns:(sign, key) integer arrays
+    """
+    magnitude = np.abs(values)
+    sign = np.sign(values).astype('int8')
+    sign[magnitude < 1e-9] = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        key = np.ceil(np.log(magnitude) / LOG_GAMMA)
+    key = np.where(sign == 0, 0, key).astype('int32')
+    return sign, key
+
+
+def bucket_values(sign: np.ndarray, key: np.ndarray) -> np.ndarray:
+    """Representative reading of each sketch bucket."""
+    return sign * 2 * SKETCH_GAMMA ** key.astype('float64') / (SKETCH_GAMMA + 1)
+
+
+class Rollup:
+    """Summary of one dataset that is enough to draw every Exploratory Analysis chart.
+    All parts are counts or sums, so rollups of separate chunks merge by addition.
+    - hourly: per hour, sum and count of each sensor
+    - sketch: per model and sensor, counts of readings in each quantile-sketch bucket
+    - failures: rows per failure type
+    - ages: rows per age and failure type (failure 'none' for rows without a failure)
+    """
+
+    def __init__(self, rows=0, hourly=None, sketch=None, failures=None, ages=None):
+        self.rows = rows
+        self.hourly = hourly
+        self.sketch = sketch
+        self.failures = failures
+        self.ages = ages
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'Rollup':
+        """Builds the rollup of one preprocessed chunk."""
+        sensors = [c for c in SENSOR_COLS if c in df.columns]
+        rollup = cls(rows=len(df))
+
+        if 'hour' in df.columns and sensors:
+            hourly = df.groupby('hour')[sensors].agg(['sum', 'count'])
+            rollup.hourly = hourly.astype('float64')
+
+        if 'model' in df.columns and sensors:
+            model = pd.Categorical(df['model'])
+            codes = model.codes.astype('int64')
+            names = model.categories.astype(str)
+            parts = []
+            for sensor in sensors:
+                values = df[sensor].to_numpy(dtype='float64')
+                present = ~np.isnan(values) & (codes >= 0)
+                sign, key = sketch_buckets(values[present])
+                # one int64 per (model, sign, key) so the counting is a single np.unique
+                group = codes[present] * 3 + sign + 1
+                combined = (group << 32) + (key.astype('int64') + 2**31)
+                unique, counts = np.unique(combined, return_counts=True)
+                group, key = unique >> 32, (unique & 0xFFFFFFFF) - 2**31
+                parts.append(pd.Series(counts, index=pd.MultiIndex.from_arrays(
+                    [names[group // 3], np.full(len(unique), sensor), group % 3 - 1, key],
+                    names=['model', 'sensor', 'sign', 'key'])))
+            rollup.sketch = pd.concat(parts)
+
+        failures = event_flags(df, 'failure')
+        if failures is not None:
+            counts = failures.sum().astype('int64')
+            rollup.failures = counts[counts > 0]
+
+            if 'age' in df.columns:
+                # a row counts once under every failure it carries, rows without one under 'none'
+                labeled = failures.assign(none=~failures.any(axis=1))
+                ages = labeled.groupby(df['age'].to_numpy()).sum().stack().astype('int64')
+                ages = ages[ages > 0]
+                ages.index.names = ['age', 'failure']
+                rollup.ages = ages
+
+        return rollup
+
+    def merge(self, other: 'Rollup') -> 'Rollup':
+        """Adds the counts of `other` into a new rollup."""
+        def add(a, b):
+            if a is None or b is None:
+                return b if a is None else a
+            return a.add(b, fill_value=0)
+
+        return Rollup(self.rows + other.rows, add(self.hourly, other.hourly),
+                      add(self.sketch, other.sketch), add(self.failures, other.failures),
+                      add(self.ages, other.ages))
+
+    def hourly_means(self) -> pd.DataFrame:
+        """Mean of each sensor per hour of day."""
+        sums = self.hourly.xs('sum', axis=1, level=1)
+        counts = self.hourly.xs('count', axis=1, level=1)
+        return sums / counts
+
+    def failure_summary(self) -> pd.DataFrame:
+        """Failure counts and their percentage of all rows, as in the notebook."""
+        summary = self.failures.sort_values(ascending=False).reset_index()
+        summary.columns = ['Failure Type', 'Frequency']
+        summary['Frequency'] = summary['Frequency'].astype(int)
+        summary['Percentage (%)'] = (summary['Frequency'] / self.rows * 100).round(2)
+        return summary
+
+    def age_failure_rates(self, bins: int = 3) -> pd.DataFrame:
+        """Failure rate (% of readings) per failure type in `bins` equal-width age buckets."""
+        ages = self.ages.rename('rows').reset_index()
+        ages['age bucket'] = pd.cut(ages['age'], bins=bins).astype(str)
+        totals = ages.groupby('age bucket', sort=False)['rows'].sum()
+        failed = ages[ages['failure'] != 'none']
+        rates = failed.groupby(['age bucket', 'failure'], sort=False)['rows'].sum().reset_index()
+        rates['Failure rate (%)'] = rates['rows'] / rates['age bucket'].map(totals) * 100
+        return rates
+
+    def box_stats(self, sensor: str) -> list:
+        """Box plot statistics per model read from the sketch, in the format of Axes.bxp."""
+        stats = []
+        for model, buckets in self.sketch.xs(sensor, level='sensor').groupby(level='model'):
+            buckets = buckets.droplevel('model')
+            values = bucket_values(buckets.index.get_level_values('sign').to_numpy(),
+                                   buckets.index.get_level_values('key').to_numpy())
+            order = np.argsort(values)
+            values, counts = values[order], buckets.to_numpy()[order]
+            cumulative = np.cumsum(counts)
+
+            def quantile(q):
+                rank = q * (cumulative[-1] - 1)
+                return values[np.searchsorted(cumulative, rank, side='right')]
+
+            q1, med, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+            low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            inside = values[(values >= low) & (values <= high)]
+            stats.append({
+                'label': model, 'q1': q1, 'med': med, 'q3': q3,
+                'whislo': inside.min(), 'whishi': inside.max(),
+                'fliers': values[(values < low) | (values > high)],
+            })
+        return stats
+
+
+# building the rollup of a dataset chunk by chunk
+def build_rollup(chunks) -> Rollup:
+    """Folds Rollup.from_frame over an iterable of preprocessed DataFrames.
+    **Parameters:chunks
+    **Returns:Rollup
+    """
+    rollup = Rollup()
+    for chunk in chunks:
+        rollup = rollup.merge(Rollup.from_frame(chunk))
+    return rollup
+
+
+# rollup of an ingested dataset, built at most once per dataset hash
+def dataset_rollup(dataset, rollup_dir: str = ROLLUP_DIR) -> Rollup:
+    """Returns the rollup of a Sensor_Ingest.ChunkedDataset from the shared 'derived' cache
+    or from `rollup_dir`, building and saving it on first use.
+    **Parameters:dataset, rollup_dir (None keeps rollups in memory only)
+    **Returns:Rollup
+    """
+    key = dataset.fingerprint()
+    path = _rollup_path(rollup_dir, key)
+
+    def load_or_build():
+        rollup = _load_rollup(path)
+        if rollup is None:
+            rollup = build_rollup(dataset.iter_chunks())
+            _save_rollup(path, rollup)
+        return rollup
+
+    return CACHES['derived'].get_or_compute(('rollup', key), load_or_build)
+
+
+# folding an appended delta into the rollup of the dataset it was appended to
+def append_rollup(dataset, delta: pd.DataFrame, previous_key: str, rollup_dir: str = ROLLUP_DIR) -> Rollup:
+    """Rollup of `dataset` after Sensor_Ingest.append_upload added `delta`: the rollup of the
+    previous fingerprint merged with the rollup of the delta rows, so the history is not
+    re-read. Falls back to dataset_rollup when the previous rollup is no longer around.
+    **Parameters:dataset, delta, previous_key (fingerprint before the append), rollup_dir
+    **Returns:Rollup
+    """
+    previous = CACHES['derived'].get(('rollup', previous_key))
+    if previous is None:
+        previous = _load_rollup(_rollup_path(rollup_dir, previous_key))
+    if previous is None:
+        return dataset_rollup(dataset, rollup_dir)
+
+    key = dataset.fingerprint()
+    rollup = previous.merge(Rollup.from_frame(delta))
+    _save_rollup(_rollup_path(rollup_dir, key), rollup)
+    CACHES['derived'].put(('rollup', key), rollup)
+    return rollup
+
+
+def _rollup_path(rollup_dir: str, key: str):
+    return os.path.join(rollup_dir, f'{key}.pkl') if rollup_dir else None
+
+
+def _load_rollup(path):
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    return None
+
+
+def _save_rollup(path, rollup: Rollup):
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(rollup, f)
+        os.replace(path + '.tmp', path)
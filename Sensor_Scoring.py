@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+from Sensor_Data import SENSOR_COLS
+from Sensor_Join import event_columns, event_flags
+from Sensor_Survival import COMPONENTS, MODEL_DIR, load_coefficients
+
+# the dashboard question: probability of failing within the next 2 days
+HORIZON_HOURS = 48
+WINDOW = '24h'
+
+# the only columns a snapshot reads, besides the replacement events (see snapshot_columns)
+SNAPSHOT_COLS = ['machineID', 'datetime', *SENSOR_COLS, 'age']
+REPLACEMENT_COLS = ['comp', 'failure']
+
+
+class RiskModel:
+    """The saved Cox coefficients of every component stacked into arrays, so a whole fleet is
+    scored with one matrix product instead of one lifelines call per machine and component.
+    """
+
+    def __init__(self, coefficients: dict):
+        self.components = list(coefficients)
+        self.covariates = coefficients[self.components[0]]['covariates']
+        for comp in self.components:
+            if coefficients[comp]['covariates'] != self.covariates:
+                raise ValueError(f"{comp} was trained on different covariates")
+
+        # (components x covariates)
+        self.params = np.array([coefficients[c]['params'] for c in self.components])
+        self.norm_mean = np.array([coefficients[c]['norm_mean'] for c in self.components])
+        self.baselines = [(np.asarray(coefficients[c]['baseline_time']),
+                           np.asarray(coefficients[c]['baseline_cumulative_hazard']))
+                          for c in self.components]
+
+    def cumulative_hazard(self, hours: np.ndarray) -> np.ndarray:
+        """Baseline cumulative hazard of every component at `hours` since replacement,
+        a step function held at its last value past the training data.
+        **Returns:(machines x components) array
+        """
+        out = np.zeros((len(hours), len(self.components)))
+        for i, (times, hazard) in enumerate(self.baselines):
+            position = np.searchsorted(times, hours[:, i], side='right') - 1
+            out[:, i] = np.where(position >= 0, hazard[np.clip(position, 0, None)], 0.0)
+        return out
+
+    def failure_probability(self, covariates: np.ndarray, hours_since: np.ndarray,
+                            horizon: float = HORIZON_HOURS) -> np.ndarray:
+        """P(failure within `horizon` hours | working now) for every machine and component:
+        1 - exp(-(H0(t + horizon) - H0(t)) * exp((x - mean) . beta)).
+        **Parameters:covariates (machines x covariates), hours_since (machines x components), horizon
+        **Returns:(machines x components) array
+        """
+        # (machines x 1 x covariates) - (components x covariates), summed against beta
+        linear = np.einsum('mck,ck->mc', covariates[:, None, :] - self.norm_mean[None], self.params)
+        increase = self.cumulative_hazard(hours_since + horizon) - self.cumulative_hazard(hours_since)
+        return 1 - np.exp(-increase * np.exp(linear))
+
+
+def load_risk_model(model_dir: str = MODEL_DIR) -> RiskModel:
+    """RiskModel from the cox_coefficients.json written by Sensor_Survival.save_models."""
+    return RiskModel(load_coefficients(model_dir))
+
+
+# the stored columns a snapshot needs
+def snapshot_columns(columns) -> list:
+    """SNAPSHOT_COLS plus the maintenance and failure columns, in either the indicator layout
+    of Sensor_Join.join_pdm or as single categorical columns, restricted to `columns`."""
+    wanted = [c for c in SNAPSHOT_COLS if c in columns]
+    return wanted + [c for col in REPLACEMENT_COLS for c in event_columns(columns, col)]
+
+
+# the latest state of every machine, read chunk by chunk
+def latest_snapshot(chunks, window: str = WINDOW, components: list = COMPONENTS) -> pd.DataFrame:
+    """Reduces preprocessed telemetry (one frame or an iterable of chunks) to one row per
+    machine: the last reading time, sensor means over the trailing `window`, age, and the
+    hours since each component was last replaced (maintenance `comp` or `failure`). A component
+    never replaced in the data counts from the machine's first reading, as in training.
+    **Parameters:chunks, window, components
+    **Returns:DataFrame indexed by machineID
+    """
+    snapshot, first, last_replaced = _reduce_snapshot(chunks, window)
+    for comp in components:
+        since = last_replaced.get(comp, pd.Series(dtype='datetime64[ns]')).reindex(snapshot.index)
+        snapshot[f'hours_since_{comp}'] = _hours(snapshot['datetime'], since.fillna(first.reindex(snapshot.index)))
+    return snapshot
+
+
+# moving a snapshot forward after an append, for the affected machines only
+def update_snapshot(snapshot: pd.DataFrame, recent: pd.DataFrame, window: str = WINDOW,
+                    components: list = COMPONENTS) -> pd.DataFrame:
+    """Snapshot after new readings were appended: the machines in `recent` are re-reduced from
+    their readings of the trailing `window` (delta included), carrying the replacement times
+    of the old snapshot forward; every other machine keeps its row.
+    **Parameters:snapshot (from latest_snapshot), recent (the readings newer than `window`
+    before each affected machine's first new reading), window, components
+    **Returns:DataFrame indexed by machineID
+    """
+    fresh, first, last_replaced = _reduce_snapshot(recent, window)
+    previous = snapshot.reindex(fresh.index)
+    for comp in components:
+        carried = previous['datetime'] - pd.to_timedelta(previous[f'hours_since_{comp}'], unit='h')
+        seen = last_replaced.get(comp, pd.Series(dtype='datetime64[ns]')).reindex(fresh.index)
+        # machines new to the snapshot count from their first reading
+        since = pd.concat([carried, seen], axis=1).max(axis=1).fillna(first.reindex(fresh.index))
+        fresh[f'hours_since_{comp}'] = _hours(fresh['datetime'], since)
+    return pd.concat([snapshot.drop(fresh.index, errors='ignore'), fresh[snapshot.columns]]).sort_index()
+
+
+def _hours(end: pd.Series, start: pd.Series) -> pd.Series:
+    return (end - start) / pd.Timedelta('1h')
+
+
+# trailing-window sensor means, first reading and last replacement per machine and component
+def _reduce_snapshot(chunks, window: str) -> tuple:
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    span = pd.Timedelta(window)
+    tails, firsts, replaced = [], [], []
+
+    for chunk in chunks:
+        machine_last = chunk.groupby('machineID')['datetime'].transform('max')
+        kept = [c for c in ['machineID', 'datetime', *SENSOR_COLS, 'age'] if c in chunk.columns]
+        tails.append(chunk.loc[chunk['datetime'] > machine_last - span, kept])
+        firsts.append(chunk.groupby('machineID')['datetime'].min())
+        for col in REPLACEMENT_COLS:
+            flags = event_flags(chunk, col)
+            if flags is None:
+                continue
+            # a machine's latest row carrying each component, per component
+            for comp, hit in flags.items():
+                if hit.any():
+                    rows = chunk.loc[hit.to_numpy(), ['machineID', 'datetime']]
+                    latest = rows.groupby('machineID')['datetime'].max()
+                    replaced.append(pd.concat({comp: latest}).swaplevel())
+
+    tail = pd.concat(tails)
+    tail = tail[tail['datetime'] > tail.groupby('machineID')['datetime'].transform('max') - span]
+    grouped = tail.groupby('machineID')
+    sensors = [c for c in SENSOR_COLS if c in tail.columns]
+
+    snapshot = grouped[sensors].mean().add_suffix(f'_mean_{window}')
+    snapshot.insert(0, 'datetime', grouped['datetime'].max())
+    if 'age' in tail.columns:
+        snapshot['age'] = grouped['age'].last()
+
+    first = pd.concat(firsts).groupby(level=0).min()
+    last_replaced = (pd.concat(replaced).groupby(level=[0, 1]).max().unstack()
+                     if replaced else pd.DataFrame(index=snapshot.index))
+    return snapshot, first, last_replaced
+
+
+# scoring and ranking the whole fleet
+def rank_fleet(model: RiskModel, snapshot: pd.DataFrame, horizon: float = HORIZON_HOURS) -> pd.DataFrame:
+    """Scores every machine of `snapshot` (from latest_snapshot) in one batch and ranks the fleet
+    by its riskiest component.
+    **Parameters:model, snapshot, horizon
+    **Returns:DataFrame with one risk column per component, top_component and max_risk,
+    sorted from the riskiest machine down
+    """
+    covariates = snapshot.reindex(columns=model.covariates).to_numpy(dtype='float64')
+    hours_since = snapshot.reindex(columns=[f'hours_since_{c}' for c in model.components]).to_numpy(dtype='float64')
+    risk = model.failure_probability(covariates, hours_since, horizon)
+
+    ranked = pd.DataFrame(risk, index=snapshot.index, columns=[f'risk_{c}' for c in model.components])
+    ranked.insert(0, 'last reading', snapshot['datetime'])
+    filled = np.nan_to_num(risk, nan=-1.0)
+    ranked['top_component'] = np.array(model.components)[filled.argmax(axis=1)]
+    ranked['max_risk'] = np.nanmax(np.where(np.isnan(risk), -np.inf, risk), axis=1)
+    ranked.loc[np.isnan(risk).all(axis=1), ['top_component', 'max_risk']] = [None, np.nan]
+    return ranked.sort_values('max_risk', ascending=False)
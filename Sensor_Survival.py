@@ -0,0 +1,219 @@
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Sensor_Features import build_features
+from Sensor_Join import KEY_COLS, broadcast_machines, typed_keys
+
+MODEL_DIR = 'models'
+COMPONENTS = ['comp1', 'comp2', 'comp3', 'comp4']
+
+# time-varying covariates of the Cox models: daily sensor means and machine age
+COVARIATES = ['volt_mean_24h', 'rotate_mean_24h', 'pressure_mean_24h', 'vibration_mean_24h', 'age']
+
+
+# covariate snapshots taken every `step` from the telemetry
+def covariate_snapshots(telemetry: pd.DataFrame, machines: pd.DataFrame = None, step: str = '24h',
+                        freq: str = '1h') -> pd.DataFrame:
+    """Rolling features sampled every `step` per machine, with the machine attributes attached.
+    Each snapshot holds the covariates from its timestamp until the next snapshot.
+    **Parameters:telemetry (sorted by machineID and datetime), machines, step, freq
+    **Returns:DataFrame with machineID, datetime and the feature columns
+    """
+    features = build_features(telemetry, windows=(step,), lags=(), freq=freq)
+    seconds = features['datetime'].to_numpy(dtype='datetime64[s]').view('int64')
+    on_step = (seconds - seconds.min()) % int(pd.Timedelta(step).total_seconds()) == 0
+    snapshots = features[on_step].reset_index(drop=True)
+
+    if machines is not None:
+        attrs = broadcast_machines(snapshots, machines)
+        snapshots['age'] = attrs['age'].to_numpy()
+    return snapshots
+
+
+# replacement times of one component, flagged when the replacement followed a failure
+def component_boundaries(maint: pd.DataFrame, failures: pd.DataFrame, comp: str) -> pd.DataFrame:
+    """Every time component `comp` was replaced (maintenance or failure) per machine.
+    **Parameters:maint, failures, comp
+    **Returns:DataFrame with machineID, datetime and failure (bool), sorted by machine and time
+    """
+    replaced = typed_keys(maint[maint['comp'] == comp][KEY_COLS]).assign(failure=False)
+    failed = typed_keys(failures[failures['failure'] == comp][KEY_COLS]).assign(failure=True)
+    boundaries = pd.concat([replaced, failed], ignore_index=True)
+    # a failure and its repair share a timestamp; keep one boundary that counts as a failure
+    boundaries = boundaries.groupby(KEY_COLS, as_index=False)['failure'].max()
+    return boundaries.sort_values(KEY_COLS, ignore_index=True)
+
+
+# (start, stop, event) rows of one component, built without looping over machines
+def build_intervals(snapshots: pd.DataFrame, boundaries: pd.DataFrame, step: str = '24h',
+                    covariates: list = COVARIATES) -> pd.DataFrame:
+    """Long-format counting-process table for lifelines' CoxTimeVaryingFitter.
+    A spell is the life of one component between two replacements; time is measured in
+    hours since the spell started. Each snapshot opens an interval that ends at the next
+    snapshot or at the end of the spell, whichever comes first, and the interval that ends
+    a spell with a failure has event = 1. Spells that began before the telemetry start when
+    the machine is first seen, and their first interval starts later (delayed entry).
+    **Parameters:snapshots (from covariate_snapshots), boundaries (from component_boundaries),
+    step, covariates
+    **Returns:DataFrame with machineID, spell, start, stop, event and the covariates
+    """
+    snap_machine = snapshots['machineID'].to_numpy().astype('int64')
+    snap_time = snapshots['datetime'].to_numpy(dtype='datetime64[s]').view('int64')
+    bnd_machine = boundaries['machineID'].to_numpy().astype('int64')
+    bnd_time = boundaries['datetime'].to_numpy(dtype='datetime64[s]').view('int64')
+    bnd_failure = boundaries['failure'].to_numpy(dtype=bool)
+
+    # one sortable key per (machine, time); the stride keeps machines apart
+    times = np.r_[snap_time, bnd_time]
+    origin, stride = times.min(), times.max() - times.min() + 1
+    snap_key = snap_machine * stride + (snap_time - origin)
+    bnd_key = bnd_machine * stride + (bnd_time - origin)
+    by_key = np.argsort(bnd_key, kind='stable')
+    bnd_machine, bnd_time, bnd_failure, bnd_key = (
+        bnd_machine[by_key], bnd_time[by_key], bnd_failure[by_key], bnd_key[by_key])
+    order = np.argsort(snap_key, kind='stable')
+    snap_machine, snap_time, snap_key = snap_machine[order], snap_time[order], snap_key[order]
+
+    # a sentinel boundary on machine -1 at the end; index -1 (no earlier boundary) wraps onto it
+    bnd_machine = np.r_[bnd_machine, -1]
+    bnd_time = np.r_[bnd_time, 0]
+    bnd_failure = np.r_[bnd_failure, False]
+
+    # the last replacement at or before each snapshot and the one after it, on the same machine
+    last = np.searchsorted(bnd_key, snap_key, side='right') - 1
+    following = last + 1
+    has_last = bnd_machine[last] == snap_machine
+    has_next = bnd_machine[following] == snap_machine
+
+    # spells with no earlier replacement start when the machine is first seen
+    first_seen = np.r_[True, snap_machine[1:] != snap_machine[:-1]]
+    first_row = np.maximum.accumulate(np.where(first_seen, np.arange(len(snap_time)), 0))
+    spell_start = np.where(has_last, bnd_time[last], snap_time[first_row])
+    spell_end = np.where(has_next, bnd_time[following], np.iinfo('int64').max)
+    ends_in_failure = has_next & bnd_failure[following]
+
+    step_seconds = int(pd.Timedelta(step).total_seconds())
+    same_next = np.r_[snap_machine[1:] == snap_machine[:-1], False]
+    next_time = np.where(same_next, np.r_[snap_time[1:], 0], snap_time + step_seconds)
+    stop_time = np.minimum(next_time, spell_end)
+
+    table = pd.DataFrame({
+        'machineID': snapshots['machineID'].to_numpy()[order],
+        # spell ids: sorted boundary index when known, otherwise a negative id per machine
+        'spell': np.where(has_last, last, -1 - snap_machine),
+        'start': (snap_time - spell_start) / 3600,
+        'stop': (stop_time - spell_start) / 3600,
+        'event': (ends_in_failure & (spell_end <= next_time)).astype('int8'),
+    })
+    for col in covariates:
+        table[col] = snapshots[col].to_numpy()[order]
+
+    keep = (table['stop'] > table['start']) & table[covariates].notna().all(axis=1)
+    return table[keep].reset_index(drop=True)
+
+
+# interval tables for every component
+def survival_tables(telemetry: pd.DataFrame, maint: pd.DataFrame, failures: pd.DataFrame,
+                    machines: pd.DataFrame = None, components: list = COMPONENTS, step: str = '24h',
+                    covariates: list = COVARIATES) -> dict:
+    """Builds the snapshots once and the (start, stop, event) table of each component.
+    **Parameters:telemetry, maint, failures, machines, components, step, covariates
+    **Returns:dict of component -> DataFrame
+    """
+    snapshots = covariate_snapshots(telemetry, machines, step)
+    covariates = [c for c in covariates if c in snapshots.columns]
+    return {comp: build_intervals(snapshots, component_boundaries(maint, failures, comp), step, covariates)
+            for comp in components}
+
+
+# fitting one component's model; a top-level function so worker processes can import it
+def fit_component(table: pd.DataFrame, penalizer: float = 0.01):
+    """Fits lifelines' CoxTimeVaryingFitter on one component's interval table.
+    **Parameters:table (from build_intervals), penalizer
+    **Returns:fitted CoxTimeVaryingFitter
+    """
+    from lifelines import CoxTimeVaryingFitter
+
+    fitter = CoxTimeVaryingFitter(penalizer=penalizer)
+    fitter.fit(table.drop(columns='machineID'), id_col='spell', event_col='event',
+               start_col='start', stop_col='stop')
+    return fitter
+
+
+# fitting every component in parallel
+def train_models(tables: dict, max_workers: int = None, penalizer: float = 0.01) -> dict:
+    """Fits one Cox model per component across a process pool (one process per CPU by default).
+    **Parameters:tables (component -> interval table), max_workers, penalizer
+    **Returns:dict of component -> fitted CoxTimeVaryingFitter
+    """
+    components = list(tables)
+    workers = min(max_workers or os.cpu_count() or 1, len(components))
+    if workers <= 1:
+        return {comp: fit_component(tables[comp], penalizer) for comp in components}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        fitted = pool.map(fit_component, [tables[comp] for comp in components],
+                          [penalizer] * len(components))
+        return dict(zip(components, fitted))
+
+
+# the numbers scoring needs, without lifelines
+def model_coefficients(fitter) -> dict:
+    """Coefficients, covariate means and baseline cumulative hazard of a fitted model.
+    The baseline is at the covariate means, as lifelines computes it.
+    """
+    baseline = fitter.baseline_cumulative_hazard_.iloc[:, 0]
+    return {
+        'covariates': list(fitter.params_.index),
+        'params': fitter.params_.tolist(),
+        'norm_mean': fitter._norm_mean.tolist(),
+        'baseline_time': baseline.index.astype(float).tolist(),
+        'baseline_cumulative_hazard': baseline.tolist(),
+    }
+
+
+# saving the fitted models and their coefficients
+def save_models(models: dict, model_dir: str = MODEL_DIR):
+    """Pickles each fitted model to `cox_<comp>.pkl` and writes all coefficients to
+    `cox_coefficients.json` for scoring without lifelines.
+    **Parameters:models, model_dir
+    **Returns:None
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    for comp, fitter in models.items():
+        with open(os.path.join(model_dir, f'cox_{comp}.pkl'), 'wb') as f:
+            pickle.dump(fitter, f)
+
+    coefficients = {comp: model_coefficients(fitter) for comp, fitter in models.items()}
+    with open(os.path.join(model_dir, 'cox_coefficients.json'), 'w') as f:
+        json.dump(coefficients, f, indent=2)
+
+
+def load_coefficients(model_dir: str = MODEL_DIR) -> dict:
+    """Reads the coefficients written by save_models."""
+    with open(os.path.join(model_dir, 'cox_coefficients.json')) as f:
+        return json.load(f)
+
+
+# training from the Dataset/ CSVs: python Sensor_Survival.py [data_dir] [model_dir]
+if __name__ == '__main__':
+    import sys
+
+    from Sensor_Data import preprocess
+    from Sensor_Loader import load_pdm
+
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else 'Dataset'
+    model_dir = sys.argv[2] if len(sys.argv) > 2 else MODEL_DIR
+
+    pdm = load_pdm(data_dir)
+    telemetry = preprocess(pdm['telemetry'].sort_values(KEY_COLS, ignore_index=True))
+    tables = survival_tables(telemetry, pdm['maint'], pdm['failures'], pdm['machines'])
+    models = train_models(tables)
+    save_models(models, model_dir)
+    for comp, fitter in models.items():
+        print(f"{comp}: {fitter}")
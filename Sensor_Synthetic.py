@@ -0,0 +1,157 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from Sensor_Loader import DATETIME_FORMAT, SCHEMA, TABLES
+
+# the Azure PdM set: 100 machines read hourly for one year from 2015-01-01 06:00
+START = '2015-01-01 06:00'
+HOURS = 8761
+# machines generated per block; each block draws from its own seed, so for one seed a larger
+# fleet starts with the same machines as any smaller one that is a whole number of blocks
+BLOCK_MACHINES = 1000
+
+# per-sensor mean and standard deviation of the Azure telemetry
+SENSOR_STATS = {
+    'volt': (170.8, 15.5),
+    'rotate': (446.6, 52.7),
+    'pressure': (100.9, 11.0),
+    'vibration': (40.4, 5.4),
+}
+MODEL_SHARES = {'model1': 0.16, 'model2': 0.17, 'model3': 0.35, 'model4': 0.32}
+MAX_AGE = 20
+# failures per machine and year by component, and errors per machine and year not tied to a
+# failure (the Azure error rates less the errors logged before failures)
+FAILURE_RATES = {'comp1': 1.92, 'comp2': 2.59, 'comp3': 1.31, 'comp4': 1.79}
+ERROR_RATES = {'error1': 8.2, 'error2': 7.3, 'error3': 7.1, 'error4': 5.5, 'error5': 3.6}
+# each component wears out one sensor: its readings drift over the day before a failure
+# (in standard deviations of the sensor) and one error of the paired type is logged
+FAILURE_SIGNS = {'comp1': ('volt', 2.0, 'error1'), 'comp2': ('rotate', -2.5, 'error2'),
+                 'comp3': ('pressure', 2.0, 'error3'), 'comp4': ('vibration', 2.0, 'error4')}
+DRIFT_HOURS = 24
+# one component is serviced every MAINT_DAYS days per machine, starting before the telemetry
+# so the time since the last replacement is known from the first reading
+MAINT_DAYS = 20
+MAINT_HISTORY_DAYS = 180
+
+
+# one machine block of all five tables
+def generate_block(block: int, machines: int, hours: int = HOURS, start: str = START, seed: int = 0) -> dict:
+    """Generates machines `block * BLOCK_MACHINES + 1` onwards (at most BLOCK_MACHINES of them).
+    Failures are drawn per machine, day and component at 06:00 with a rate that grows with age;
+    each one is preceded by drifting readings and an error and followed by a replacement.
+    **Parameters:block, machines (in this block), hours, start, seed
+    **Returns:dict of table name -> DataFrame with the dtypes of Sensor_Loader.SCHEMA
+    """
+    rng = np.random.default_rng([seed, block])
+    ids = np.arange(block * BLOCK_MACHINES + 1, block * BLOCK_MACHINES + machines + 1)
+    start = pd.Timestamp(start)
+    times = pd.date_range(start, periods=hours, freq='h')
+
+    age = rng.integers(0, MAX_AGE + 1, machines)
+    machines_table = pd.DataFrame({
+        'machineID': ids,
+        'model': rng.choice(list(MODEL_SHARES), machines, p=list(MODEL_SHARES.values())),
+        'age': age,
+    })
+
+    rows = machines * hours
+    readings = {sensor: rng.standard_normal(rows, dtype=np.float32) * np.float32(std) + np.float32(mean)
+                for sensor, (mean, std) in SENSOR_STATS.items()}
+
+    # failures: one Bernoulli draw per machine, day and component; older machines fail more
+    days = (hours - 1) // 24 + 1
+    wear = (0.5 + age / MAX_AGE)[:, None]
+    failures, errors = [], []
+    ramp = np.linspace(0, 1, DRIFT_HOURS, endpoint=False, dtype=np.float32)
+    for comp, rate in FAILURE_RATES.items():
+        machine, day = np.nonzero(rng.random((machines, days)) < rate / 365 * wear)
+        # the first day has no history to drift over
+        machine, day = machine[day > 0], day[day > 0]
+        hour = day * 24
+        failures.append(pd.DataFrame({'datetime': times[hour], 'machineID': ids[machine], 'failure': comp}))
+
+        sensor, shift, error = FAILURE_SIGNS[comp]
+        drifting = (machine * hours + hour)[:, None] - DRIFT_HOURS + np.arange(DRIFT_HOURS)
+        np.add.at(readings[sensor], drifting.ravel(),
+                  np.tile(ramp * np.float32(shift * SENSOR_STATS[sensor][1]), len(hour)))
+        before = hour - rng.integers(1, DRIFT_HOURS, len(hour))
+        errors.append(pd.DataFrame({'datetime': times[before], 'machineID': ids[machine], 'errorID': error}))
+
+    for error, rate in ERROR_RATES.items():
+        count = rng.poisson(rate * hours / 8760, machines)
+        machine = np.repeat(np.arange(machines), count)
+        hour = rng.integers(0, hours, len(machine))
+        errors.append(pd.DataFrame({'datetime': times[hour], 'machineID': ids[machine], 'errorID': error}))
+
+    # scheduled service of a random component on each machine's own cycle, plus every failure
+    offsets = rng.integers(0, MAINT_DAYS, machines)
+    service = np.arange(-MAINT_HISTORY_DAYS, days, MAINT_DAYS)
+    machine = np.repeat(np.arange(machines), len(service))
+    day = np.tile(service, machines) + offsets[machine]
+    machine, day = machine[day < days], day[day < days]
+    maint = [pd.DataFrame({'datetime': start + pd.to_timedelta(day, 'D'), 'machineID': ids[machine],
+                           'comp': rng.choice(list(FAILURE_RATES), len(machine))})]
+    maint += [f.rename(columns={'failure': 'comp'}) for f in failures]
+
+    tables = {
+        'errors': pd.concat(errors, ignore_index=True),
+        'failures': pd.concat(failures, ignore_index=True),
+        'machines': machines_table,
+        'maint': pd.concat(maint, ignore_index=True).drop_duplicates(),
+        'telemetry': pd.DataFrame({'datetime': np.tile(times, machines), 'machineID': np.repeat(ids, hours),
+                                   **readings}),
+    }
+    return {name: _typed(df) for name, df in tables.items()}
+
+
+# one dict of tables per machine block
+def iter_pdm(machines: int = 100, hours: int = HOURS, start: str = START, seed: int = 0):
+    """Yields generate_block for each block of up to BLOCK_MACHINES machines, so fleets of any
+    size can be written out without holding them in memory.
+    **Parameters:machines, hours, start, seed
+    **Returns:iterator of dicts of table name -> DataFrame
+    """
+    for block in range(-(-machines // BLOCK_MACHINES)):
+        yield generate_block(block, min(BLOCK_MACHINES, machines - block * BLOCK_MACHINES), hours, start, seed)
+
+
+# a whole synthetic fleet in memory
+def generate_pdm(machines: int = 100, hours: int = HOURS, start: str = START, seed: int = 0) -> dict:
+    """Synthetic stand-in for the five Azure PdM tables, shaped as Sensor_Loader.load_pdm returns them.
+    **Parameters:machines, hours, start, seed
+    **Returns:dict of table name -> DataFrame
+    """
+    blocks = list(iter_pdm(machines, hours, start, seed))
+    return {name: _concat([block[name] for block in blocks]) for name in TABLES}
+
+
+# a synthetic fleet written as PdM_<table>.csv files, block by block
+def write_pdm(directory: str, machines: int = 100, hours: int = HOURS, start: str = START, seed: int = 0) -> dict:
+    """Writes the tables in the Azure CSV layout, readable by Sensor_Loader.load_pdm and the
+    upload page. Memory use stays at one block whatever the fleet size.
+    **Parameters:directory, machines, hours, start, seed
+    **Returns:dict of table name -> row count
+    """
+    os.makedirs(directory, exist_ok=True)
+    counts = dict.fromkeys(TABLES, 0)
+    for block in iter_pdm(machines, hours, start, seed):
+        for name, df in block.items():
+            df.to_csv(os.path.join(directory, f'PdM_{name}.csv'), mode='w' if counts[name] == 0 else 'a',
+                      header=counts[name] == 0, index=False, date_format=DATETIME_FORMAT)
+            counts[name] += len(df)
+    return counts
+
+
+# event tables sorted like the Azure files and cast to the loader's dtypes
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    keys = [c for c in ['machineID', 'datetime'] if c in df.columns]
+    df = df.sort_values(keys, kind='mergesort', ignore_index=True)
+    return df.astype({c: SCHEMA[c] for c in df.columns if c in SCHEMA})
+
+
+# blocks carry their own categories, so they are unioned before concatenating
+def _concat(frames: list) -> pd.DataFrame:
+    df = pd.concat(frames, ignore_index=True)
+    return df.astype({c: SCHEMA[c] for c in df.columns if SCHEMA.get(c) == 'category'})
@@ -0,0 +1,64 @@
+"""Throughput of Sensor_Anomaly on a synthetic fleet: batch mode over a full year, incremental
+mode fed one hour at a time, and pandas groupby().ewm() computing the same statistics.
+
+Run from the repository root:
+    python benchmarks/bench_anomaly.py [--machines 100 1000] [--hours 8760]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Sensor_Anomaly imports scipy.signal on first use; importing it here keeps that out of the
+# first timed batch
+import scipy.signal  # noqa: F401
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_features import synthetic_fleet  # noqa: E402
+from Sensor_Anomaly import ALPHA, AnomalyDetector, detect_anomalies  # noqa: E402
+from Sensor_Data import SENSOR_COLS  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+# the same EWMA mean and variance with pandas, one group at a time
+def pandas_ewm(telemetry):
+    grouped = telemetry.groupby('machineID')[SENSOR_COLS].ewm(alpha=ALPHA, adjust=False)
+    return grouped.mean(), grouped.var(bias=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--machines', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--hours', type=int, default=8760)
+    args = parser.parse_args()
+
+    print(f"{'machines':>9}{'readings':>14}{'batch s':>9}{'M readings/s':>14}{'flagged':>9}")
+    for machines in args.machines:
+        telemetry, _, _ = synthetic_fleet(machines, args.hours)
+        readings = len(telemetry) * len(SENSOR_COLS)
+        scores, seconds = timed(lambda: detect_anomalies(telemetry))
+        print(f"{machines:>9}{readings:>14,}{seconds:>9.2f}{readings / seconds / 1e6:>14.1f}"
+              f"{int(scores['anomaly'].sum()):>9,}")
+        del scores
+
+    machines = max(args.machines)
+    telemetry, _, _ = synthetic_fleet(machines, 24 * 7)
+    hours = [batch for _, batch in telemetry.groupby('datetime', sort=True)]
+    detector = AnomalyDetector()
+    _, seconds = timed(lambda: [detector.update(batch) for batch in hours])
+    print(f"incremental, {machines} machines one hour at a time: {seconds / len(hours) * 1000:.2f} ms per hour, "
+          f"{len(telemetry) * len(SENSOR_COLS) / seconds / 1e6:.2f} M readings/s")
+
+    telemetry, _, _ = synthetic_fleet(min(args.machines), args.hours)
+    _, seconds = timed(lambda: pandas_ewm(telemetry))
+    print(f"pandas groupby().ewm() mean and var on {min(args.machines)} machines: "
+          f"{len(telemetry) * len(SENSOR_COLS) / seconds / 1e6:.1f} M readings/s")
+
+
+if __name__ == '__main__':
+    main()
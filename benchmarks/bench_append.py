@@ -0,0 +1,82 @@
+"""Cost of an hourly delta: Sensor_Ingest.append_upload plus the incremental rollup, snapshot
+and feature updates, against reloading the whole history and rebuilding them, for a
+synthetic fleet with a growing history.
+
+Run from the repository root:
+    python benchmarks/bench_append.py [--machines 100] [--days 30 90 365]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_features import synthetic_fleet  # noqa: E402
+from Sensor_Features import append_features, build_features, feature_reach  # noqa: E402
+from Sensor_Ingest import append_upload, ingest_upload  # noqa: E402
+from Sensor_Rollup import append_rollup, build_rollup, dataset_rollup  # noqa: E402
+from Sensor_Scoring import WINDOW, latest_snapshot, update_snapshot  # noqa: E402
+
+
+def csv_bytes(df: pd.DataFrame) -> io.BytesIO:
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def incremental(dataset, delta_csv):
+    previous = dataset.fingerprint()
+    snapshot = latest_snapshot(dataset.iter_chunks())
+    start = time.perf_counter()
+    delta = append_upload(dataset, delta_csv, 'delta.csv')
+    append_rollup(dataset, delta, previous, rollup_dir=None)
+    first_new = delta.groupby('machineID')['datetime'].min()
+    update_snapshot(snapshot, dataset.recent(first_new - pd.Timedelta(WINDOW)))
+    append_features(dataset.recent(first_new - feature_reach()), delta)
+    return time.perf_counter() - start
+
+
+def full_reload(history_csv):
+    dataset = ingest_upload(history_csv, 'history.csv')
+    try:
+        build_rollup(dataset.iter_chunks())
+        latest_snapshot(dataset.iter_chunks())
+        build_features(dataset.read())
+    finally:
+        dataset.remove()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--machines', type=int, default=100)
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 90, 365])
+    args = parser.parse_args()
+
+    print(f"{'history rows':>13}{'delta rows':>12}{'append s':>10}{'reload s':>10}")
+    for days in args.days:
+        telemetry, _, _ = synthetic_fleet(args.machines, days * 24 + 1)
+        last = telemetry['datetime'].max()
+        history, delta = telemetry[telemetry['datetime'] < last], telemetry[telemetry['datetime'] == last]
+
+        dataset = ingest_upload(csv_bytes(history), 'history.csv')
+        try:
+            dataset_rollup(dataset, rollup_dir=None)
+            append_s = incremental(dataset, csv_bytes(delta))
+        finally:
+            dataset.remove()
+        _, reload_s = timed(lambda: full_reload(csv_bytes(telemetry)))
+        print(f"{len(history):>13,}{len(delta):>12,}{append_s:>10.3f}{reload_s:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Times Sensor_Data.impute against the original printing cleaning function on the joined PdM
+dataset with part of the age column blanked out (the joined data has none missing).
+
+Run from the repository root:
+    python benchmarks/bench_cleaning.py [--data-dir Dataset] [--missing 0.05] [--repeat 3]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Data import impute  # noqa: E402
+from Sensor_Join import join_pdm  # noqa: E402
+from Sensor_Loader import load_pdm  # noqa: E402
+
+
+# the implementation this benchmark replaced, kept verbatim as the baseline
+def legacy_cleaning(data_csv, data_excel, col):
+    if data_csv is not None:
+        print(f"Print the no of null values: {data_csv.isna().sum()}")
+        print("=======================================================================")
+        print()
+        print(f" {data_csv[data_csv['age'].isna()]}")
+        print()
+        print("========================================================================")
+        print(f"fill the null values using forward fill: {data_csv['age'].ffill(inplace=True)}")
+        print("========================================================================")
+        print()
+        print(f"fill the null values using backward fill: {data_csv['age'].bfill(inplace=True)}")
+        print()
+        print("=======================================================================")
+        print(f"Print the no of null values: {data_csv.isna().sum()}")
+        print()
+
+    elif data_excel is not None:
+        print(f"Print the no of null values: {data_excel.isna().sum()}")
+        print("=======================================================================")
+        print()
+        print(f" {data_excel[data_excel['age'].isna()]}")
+        print()
+        print("========================================================================")
+        print(f"fill the null values using forward fill: {data_excel['age'].ffill(inplace=True)}")
+        print("========================================================================")
+        print()
+        print(f"fill the null values using backward fill: {data_excel['age'].bfill(inplace=True)}")
+        print()
+        print("=======================================================================")
+        print(f"Print the no of null values: {data_excel.isna().sum()}")
+        print()
+
+    if data_csv is not None:
+        combine_copy = data_csv.copy()
+        combine_copy['age'].fillna(combine_copy['age'].median(), inplace=True)
+
+    elif data_excel is not None:
+        combine_copy = data_excel.copy()
+        combine_copy['age'].fillna(combine_copy['age'].median(), inplace=True)
+
+
+def best_of(fn, frame, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        df = frame.copy()
+        start = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default='Dataset')
+    parser.add_argument('--missing', type=float, default=0.05)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    tables = load_pdm(args.data_dir, cache_dir=None)
+    frame = join_pdm(tables['telemetry'], tables['errors'], tables['failures'],
+                     tables['maint'], tables['machines'])
+    frame['age'] = frame['age'].astype('float32')
+    blank = np.random.default_rng(0).random(len(frame)) < args.missing
+    frame.loc[blank, 'age'] = np.nan
+
+    # the printed output goes nowhere so only the work behind it is timed
+    def legacy(df):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+            warnings.simplefilter('ignore', FutureWarning)
+            legacy_cleaning(df, None, 'age')
+
+    _, report = impute(frame)
+    results = {
+        'cleaning (original, stdout to devnull)': best_of(legacy, frame, args.repeat),
+        'impute': best_of(impute, frame, args.repeat),
+        'impute(inplace=True)': best_of(lambda df: impute(df, inplace=True), frame, args.repeat),
+    }
+
+    baseline = results['cleaning (original, stdout to devnull)']
+    print(f"{len(frame):,} rows, {int(blank.sum()):,} ages blanked, best of {args.repeat}")
+    print(report.to_frame().to_string())
+    print(f"{'function':<42}{'seconds':>10}{'speedup':>10}")
+    for name, secs in results.items():
+        print(f"{name:<42}{secs:>10.3f}{baseline / secs:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Points and time to draw one machine's four sensor traces over growing date ranges: raw
+readings versus Sensor_Downsample.TracePyramid queries at screen resolution.
+
+Run from the repository root:
+    python benchmarks/bench_downsample.py [--years 5] [--points 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_features import synthetic_fleet  # noqa: E402
+from Sensor_Data import SENSOR_COLS  # noqa: E402
+from Sensor_Downsample import TracePyramid  # noqa: E402
+
+
+def render(traces: dict) -> float:
+    start = time.perf_counter()
+    fig, axes = plt.subplots(2, 2, figsize=(18, 10))
+    for ax, trace in zip(axes.ravel(), traces.values()):
+        ax.plot(trace.index, trace.to_numpy(), linewidth=0.8)
+    fig.canvas.draw()
+    plt.close(fig)
+    return time.perf_counter() - start
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--points', type=int, default=1000)
+    args = parser.parse_args()
+
+    telemetry, _, _ = synthetic_fleet(1, args.years * 8760)
+    pyramid, build_s = timed(lambda: TracePyramid(telemetry))
+    print(f"pyramid of {len(telemetry):,} readings: {build_s * 1000:.1f} ms, {pyramid.nbytes / 1e6:.1f} MB")
+
+    raw = telemetry.set_index('datetime')[SENSOR_COLS]
+    start = raw.index[0]
+    print(f"{'range':>10}{'raw pts':>10}{'raw draw s':>12}{'pyramid pts':>13}{'query ms':>10}{'draw s':>8}")
+    for label, span in [('1 week', '7D'), ('1 month', '30D'), ('1 year', '365D'), (f'{args.years} years', None)]:
+        end = raw.index[-1] if span is None else start + pd.Timedelta(span)
+        window = raw[start:end]
+        raw_s = render({sensor: window[sensor] for sensor in SENSOR_COLS})
+        traces, query_s = timed(lambda: pyramid.query(1, start, end, args.points))
+        points = sum(len(trace) for trace in traces.values())
+        print(f"{label:>10}{window.size:>10,}{raw_s:>12.3f}{points:>13,}{query_s * 1000:>10.2f}{render(traces):>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Times Sensor_Features.build_features on synthetic hourly fleets (default: the PdM fleet of
+100 machines and 10x that), against pandas groupby().rolling() on the smallest fleet.
+Before timing, the rolling features of a small fleet with missing hours and missing readings
+are checked against pandas, so windows holding zero or one reading are covered.
+
+Run from the repository root:
+    python benchmarks/bench_features.py [--machines 100 1000] [--hours 8760]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Data import SENSOR_COLS  # noqa: E402
+from Sensor_Features import STATS, WINDOWS, build_features, rolling_features  # noqa: E402
+
+
+def synthetic_fleet(machines: int, hours: int, seed: int = 0) -> tuple:
+    rng = np.random.default_rng(seed)
+    rows = machines * hours
+    telemetry = pd.DataFrame({
+        'machineID': np.repeat(np.arange(1, machines + 1), hours).astype('int32'),
+        'datetime': np.tile(pd.date_range('2015-01-01 06:00', periods=hours, freq='h'), machines),
+        'volt': rng.normal(170, 15, rows).astype('float32'),
+        'rotate': rng.normal(446, 52, rows).astype('float32'),
+        'pressure': rng.normal(100, 11, rows).astype('float32'),
+        'vibration': rng.normal(40, 5, rows).astype('float32'),
+    })
+
+    def events(per_machine, col, values):
+        picked = rng.choice(rows, machines * per_machine, replace=False)
+        return telemetry.iloc[picked][['datetime', 'machineID']].assign(
+            **{col: rng.choice(values, len(picked))})
+
+    errors = events(40, 'errorID', [f'error{i}' for i in range(1, 6)])
+    maint = events(30, 'comp', [f'comp{i}' for i in range(1, 5)])
+    return telemetry, errors, maint
+
+
+# what a straightforward pandas implementation of the rolling part looks like
+def pandas_rolling(telemetry):
+    grouped = telemetry.set_index('datetime').groupby('machineID')[SENSOR_COLS]
+    return [grouped.rolling(window).agg(list(STATS)) for window in WINDOWS]
+
+
+# rolling features of a gappy fleet against pandas: dropped hours and NaN readings leave
+# windows with no reading or a single one
+def check_against_pandas(machines: int = 20, hours: int = 500, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    telemetry, _, _ = synthetic_fleet(machines, hours, seed)
+    telemetry = telemetry[rng.random(len(telemetry)) > 0.4].reset_index(drop=True)
+    for sensor in SENSOR_COLS:
+        telemetry.loc[rng.random(len(telemetry)) < 0.2, sensor] = np.nan
+
+    ours = rolling_features(telemetry, lags=())
+    expected = pandas_rolling(telemetry)
+    for window, frame in zip(WINDOWS, expected):
+        for sensor in SENSOR_COLS:
+            for stat in STATS:
+                np.testing.assert_allclose(ours[f'{sensor}_{stat}_{window}'].to_numpy(),
+                                           frame[(sensor, stat)].to_numpy(dtype='float32'),
+                                           rtol=1e-4, atol=1e-3, err_msg=f'{sensor}_{stat}_{window}')
+    print(f"rolling features match pandas on {machines} machines with gaps ({len(telemetry):,} rows)")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--machines', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--hours', type=int, default=8760)
+    args = parser.parse_args()
+
+    check_against_pandas()
+    print(f"{'machines':>9}{'rows':>13}{'features':>10}{'seconds':>10}{'M rows/s':>10}")
+    for machines in args.machines:
+        telemetry, errors, maint = synthetic_fleet(machines, args.hours)
+        features, seconds = timed(lambda: build_features(telemetry, errors, maint))
+        width = features.shape[1] - 2
+        print(f"{machines:>9}{len(telemetry):>13,}{width:>10}{seconds:>10.2f}{len(telemetry) / seconds / 1e6:>10.2f}")
+        del features
+
+    telemetry, _, _ = synthetic_fleet(min(args.machines), args.hours)
+    _, seconds = timed(lambda: pandas_rolling(telemetry))
+    print(f"pandas groupby().rolling() on {min(args.machines)} machines, rolling part only: {seconds:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Peak RSS of Sensor_Ingest.ingest_upload against a whole-file read_csv + preprocess,
+for growing copies of the PdM telemetry.
+
+Each measurement runs in a fresh interpreter so the peak belongs to that run alone.
+Run from the repository root (Linux/macOS):
+    python benchmarks/bench_ingest.py [--data-dir Dataset] [--copies 1 2 4]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUNNERS = {
+    'whole file': (
+        "import pandas as pd\n"
+        "from Sensor_Data import preprocess\n"
+        "preprocess(pd.read_csv({path!r}), inplace=True)\n"),
+    'chunked': (
+        "from Sensor_Ingest import ingest_upload\n"
+        "ingest_upload({path!r}, 'upload.csv', store_dir={store!r}).remove()\n"),
+}
+
+
+def peak_rss_mb(code: str) -> tuple:
+    code += "import resource\nprint(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                          capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = int(done.stdout.split()[-1])
+    return peak / (1e6 if sys.platform == 'darwin' else 1e3), seconds
+
+
+def write_copies(source: str, target: str, copies: int):
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        header = src.readline()
+        body = src.read()
+        dst.write(header)
+        for _ in range(copies):
+            dst.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default='Dataset')
+    parser.add_argument('--copies', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    source = os.path.abspath(os.path.join(args.data_dir, 'PdM_telemetry.csv'))
+    work = tempfile.mkdtemp(prefix='sensorsync-bench-')
+    try:
+        print(f"{'file MB':>8}  {'runner':<12}{'peak RSS MB':>12}{'seconds':>10}")
+        for copies in args.copies:
+            path = os.path.join(work, f'telemetry-x{copies}.csv')
+            write_copies(source, path, copies)
+            size = os.path.getsize(path) / 1e6
+            for name, template in RUNNERS.items():
+                code = template.format(path=path, store=os.path.join(work, 'store'))
+                peak, seconds = peak_rss_mb(code)
+                print(f"{size:>8.0f}  {name:<12}{peak:>12.0f}{seconds:>10.2f}")
+            os.remove(path)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
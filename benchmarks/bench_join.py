@@ -0,0 +1,51 @@
+"""Compares the notebook's row-stacking concat against Sensor_Join.join_pdm.
+
+Run from the repository root:
+    python benchmarks/bench_join.py [--data-dir Dataset]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Join import join_pdm  # noqa: E402
+
+TABLES = ['errors', 'failures', 'machines', 'maint', 'telemetry']
+
+
+def read_tables(data_dir: str) -> dict:
+    return {name: pd.read_csv(os.path.join(data_dir, f'PdM_{name}.csv')) for name in TABLES}
+
+
+def frame_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default='Dataset')
+    args = parser.parse_args()
+
+    tables = read_tables(args.data_dir)
+
+    start = time.perf_counter()
+    stacked = pd.concat([tables[name] for name in TABLES], ignore_index=True)
+    stacked = stacked.drop_duplicates()
+    concat_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    joined = join_pdm(tables['telemetry'], tables['errors'], tables['failures'],
+                      tables['maint'], tables['machines'])
+    join_s = time.perf_counter() - start
+
+    print(f"{'method':<10}{'rows':>12}{'NaN cells':>12}{'memory MB':>12}{'seconds':>10}")
+    for name, df, secs in [('concat', stacked, concat_s), ('join_pdm', joined, join_s)]:
+        print(f"{name:<10}{len(df):>12,}{int(df.isna().sum().sum()):>12,}{frame_mb(df):>12.1f}{secs:>10.2f}")
+    print(f"memory ratio concat/join_pdm: {frame_mb(stacked) / frame_mb(joined):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Cold vs warm load of the PdM CSVs: inferred read_csv, typed parse + cache write, cache read.
+
+Run from the repository root:
+    python benchmarks/bench_loader.py [--data-dir Dataset] [--format parquet]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Loader import TABLES, load_pdm, memory_report  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default='Dataset')
+    parser.add_argument('--format', default='parquet', choices=['parquet', 'feather'])
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix='sensorsync-cache-')
+    try:
+        inferred, inferred_s = timed(lambda: {
+            name: pd.read_csv(os.path.join(args.data_dir, f'PdM_{name}.csv')) for name in TABLES})
+        _, cold_s = timed(lambda: load_pdm(args.data_dir, cache_dir, args.format))
+        typed, warm_s = timed(lambda: load_pdm(args.data_dir, cache_dir, args.format))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"{'load':<34}{'seconds':>10}")
+    print(f"{'read_csv, inferred dtypes':<34}{inferred_s:>10.2f}")
+    print(f"{'typed parse + cache write (cold)':<34}{cold_s:>10.2f}")
+    print(f"{'cache read (warm)':<34}{warm_s:>10.2f}")
+    print(f"warm speedup over read_csv: {inferred_s / warm_s:.1f}x")
+    print()
+
+    report = memory_report(inferred).join(memory_report(typed)[['memory_mb']], rsuffix='_typed')
+    report = report.rename(columns={'memory_mb': 'memory_mb_inferred'})
+    report.loc['total'] = report.sum()
+    report['rows'] = report['rows'].astype(int)
+    report['reduction'] = (report['memory_mb_inferred'] / report['memory_mb_typed']).round(1)
+    print(report[['rows', 'memory_mb_inferred', 'memory_mb_typed', 'reduction']].round(2).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Scaling curve of Sensor_Loader.load_directory: the PdM telemetry is split into one CSV per
+month plus a multi-sheet Excel workbook, then the drop is read with 1, 2, 4, ... workers.
+
+Run from the repository root:
+    python benchmarks/bench_parallel_load.py [--data-dir Dataset] [--workers 1 2 4 8]
+        [--excel-sheets 4] [--sheet-rows 20000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Loader import DATETIME_FORMAT, load_directory, read_typed_csv  # noqa: E402
+
+
+# one CSV per month and one workbook with a sheet per slice, as a plant drop would arrive
+def write_drop(telemetry: pd.DataFrame, directory: str, excel_sheets: int, sheet_rows: int):
+    written = telemetry.assign(datetime=telemetry['datetime'].dt.strftime(DATETIME_FORMAT))
+    for month, rows in written.groupby(telemetry['datetime'].dt.to_period('M')):
+        rows.to_csv(os.path.join(directory, f'telemetry-{month}.csv'), index=False)
+    if excel_sheets:
+        with pd.ExcelWriter(os.path.join(directory, 'telemetry-sheets.xlsx')) as writer:
+            for sheet in range(excel_sheets):
+                written.iloc[sheet * sheet_rows:(sheet + 1) * sheet_rows].to_excel(
+                    writer, sheet_name=f'plant{sheet + 1}', index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default='Dataset')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--excel-sheets', type=int, default=4)
+    parser.add_argument('--sheet-rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    telemetry = read_typed_csv(os.path.join(args.data_dir, 'PdM_telemetry.csv'))
+    drop = tempfile.mkdtemp(prefix='sensorsync-drop-')
+    try:
+        write_drop(telemetry, drop, args.excel_sheets, args.sheet_rows)
+        files = len(os.listdir(drop))
+        print(f"{files} files, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8}{'seconds':>10}{'speedup':>10}{'efficiency':>12}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            rows = len(load_directory(drop, max_workers=workers))
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f"{workers:>8}{seconds:>10.2f}{baseline / seconds:>9.2f}x{baseline / seconds / workers:>11.0%}")
+        print(f"{rows:,} rows read")
+    finally:
+        shutil.rmtree(drop, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
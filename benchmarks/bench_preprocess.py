@@ -0,0 +1,97 @@
+"""Times Sensor_Data.preprocess against the original clean_and_preprocessing and
+manipulate_date + round_value on the joined PdM telemetry.
+
+Run from the repository root:
+    python benchmarks/bench_preprocess.py [--data-dir Dataset] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Data import preprocess  # noqa: E402
+from Sensor_Join import join_pdm  # noqa: E402
+from Sensor_Loader import load_pdm  # noqa: E402
+
+SENSORS = ['volt', 'rotate', 'pressure', 'vibration']
+MONTHS = {1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
+          7: 'July', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'}
+
+
+# the implementations this benchmark replaced, kept verbatim as the baseline
+def legacy_clean_and_preprocessing(df):
+    df_clean = df.copy()
+    if 'age' in df_clean.columns:
+        df_clean['age'] = df_clean['age'].fillna(df_clean['age'].median())
+        df_clean['age'] = df_clean['age'].astype(int)
+    if 'datetime' in df_clean.columns:
+        df_clean['datetime'] = pd.to_datetime(df_clean['datetime'])
+        df_clean['year'] = df_clean['datetime'].dt.year
+        df_clean['month_num'] = df_clean['datetime'].dt.month
+        df_clean['date'] = df_clean['datetime'].dt.day
+        df_clean['hour'] = df_clean['datetime'].dt.hour
+        df_clean['month'] = df_clean['month_num'].map(MONTHS)
+    for col in SENSORS:
+        if col in df_clean.columns:
+            df_clean[col] = round(df_clean[col], 2)
+    return df_clean
+
+
+def legacy_manipulate_date_round_value(df):
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    df['year'] = df['datetime'].dt.year
+    df['month'] = df['datetime'].dt.month
+    df['date'] = df['datetime'].dt.day
+    df['hour'] = df['datetime'].dt.hour
+    df['month'] = df['month'].map(MONTHS)
+    df['age'] = df['age'].astype(int)
+    for col in SENSORS:
+        df[col] = round(df[col], 2)
+    return df
+
+
+def best_of(fn, frame, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        df = frame.copy()
+        start = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default='Dataset')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    tables = load_pdm(args.data_dir, cache_dir=None)
+    frame = join_pdm(tables['telemetry'], tables['errors'], tables['failures'],
+                     tables['maint'], tables['machines'])
+
+    # month labels and calendar values must agree with the baseline before timing anything
+    new, old = preprocess(frame), legacy_clean_and_preprocessing(frame)
+    for col in ['year', 'month_num', 'date', 'hour', 'age'] + SENSORS:
+        assert (new[col].to_numpy() == old[col].to_numpy()).all(), col
+    assert (new['month'].astype(str) == old['month']).all(), 'month'
+
+    results = {
+        'clean_and_preprocessing (original)': best_of(legacy_clean_and_preprocessing, frame, args.repeat),
+        'manipulate_date + round_value (original)': best_of(legacy_manipulate_date_round_value, frame, args.repeat),
+        'preprocess': best_of(preprocess, frame, args.repeat),
+        'preprocess(inplace=True)': best_of(lambda df: preprocess(df, inplace=True), frame, args.repeat),
+    }
+
+    baseline = results['clean_and_preprocessing (original)']
+    print(f"{len(frame):,} rows, best of {args.repeat}")
+    print(f"{'function':<44}{'seconds':>10}{'speedup':>10}")
+    for name, secs in results.items():
+        print(f"{name:<44}{secs:>10.3f}{baseline / secs:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Cost of Sensor_Profile.Profiler.stage per call, switched off and on, against an empty loop.
+
+Run from the repository root:
+    python benchmarks/bench_profile.py [--calls 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Profile import Profiler  # noqa: E402
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+
+    def staged(profiler):
+        def fn():
+            with profiler.stage('bench', rows=1):
+                pass
+        return fn
+
+    results = {
+        'empty loop': per_call(lambda: None, args.calls),
+        'stage(), disabled': per_call(staged(Profiler(enabled=False, log_path=None)), args.calls),
+        'stage(), enabled': per_call(staged(Profiler(enabled=True, log_path=None)), args.calls),
+    }
+    print(f"{'':<20}{'us per call':>12}")
+    for name, seconds in results.items():
+        print(f"{name:<20}{seconds * 1e6:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
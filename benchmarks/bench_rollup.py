@@ -0,0 +1,67 @@
+"""Per-rerun cost of the Exploratory Analysis aggregations: straight from the rows versus
+from a Sensor_Rollup.Rollup built once.
+
+Run from the repository root:
+    python benchmarks/bench_rollup.py [--data-dir Dataset]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Data import SENSOR_COLS, preprocess  # noqa: E402
+from Sensor_Join import event_flags, join_pdm  # noqa: E402
+from Sensor_Loader import load_pdm  # noqa: E402
+from Sensor_Rollup import build_rollup  # noqa: E402
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# what the charts computed from the raw rows on every rerun
+def raw_aggregations(df):
+    failures = event_flags(df, 'failure')
+    failures.sum()
+    df.groupby('hour')[SENSOR_COLS].mean()
+    df.groupby('model', observed=True)[SENSOR_COLS].quantile([0.25, 0.5, 0.75])
+    failures.groupby(df['age'].to_numpy()).sum()
+
+
+def rollup_aggregations(rollup):
+    rollup.failure_summary()
+    rollup.hourly_means()
+    for sensor in SENSOR_COLS:
+        rollup.box_stats(sensor)
+    rollup.age_failure_rates()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default='Dataset')
+    args = parser.parse_args()
+
+    tables = load_pdm(args.data_dir, cache_dir=None)
+    frame = preprocess(join_pdm(tables['telemetry'], tables['errors'], tables['failures'],
+                                tables['maint'], tables['machines']))
+
+    build_s = timed(lambda: build_rollup([frame]), repeat=1)
+    rollup = build_rollup([frame])
+
+    print(f"{len(frame):,} rows, {frame.memory_usage(deep=True).sum() / 1e6:.1f} MB; "
+          f"rollup {len(pickle.dumps(rollup)) / 1e3:.1f} KB")
+    print(f"{'step':<34}{'seconds':>10}")
+    print(f"{'build rollup (once per dataset)':<34}{build_s:>10.3f}")
+    print(f"{'aggregate raw rows (per rerun)':<34}{timed(lambda: raw_aggregations(frame)):>10.3f}")
+    print(f"{'read rollup (per rerun)':<34}{timed(lambda: rollup_aggregations(rollup)):>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Times the batched fleet scoring of Sensor_Scoring against scoring machine by machine
+(checking both give the same probabilities), for fleets up to 100x the 100-machine PdM fleet.
+Uses the coefficients in --model-dir when they exist, random ones otherwise.
+
+Run from the repository root:
+    python benchmarks/bench_scoring.py [--machines 100 1000 10000] [--model-dir models]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Scoring import HORIZON_HOURS, RiskModel, load_risk_model, rank_fleet  # noqa: E402
+from Sensor_Survival import COMPONENTS, COVARIATES  # noqa: E402
+
+
+def random_coefficients(seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    times = np.arange(24.0, 24 * 400, 24)
+    return {comp: {
+        'covariates': COVARIATES,
+        'params': rng.normal(0, 0.05, len(COVARIATES)).tolist(),
+        'norm_mean': [170.0, 446.0, 100.0, 40.0, 11.0],
+        'baseline_time': times.tolist(),
+        'baseline_cumulative_hazard': np.cumsum(rng.exponential(1e-3, len(times))).tolist(),
+    } for comp in COMPONENTS}
+
+
+def synthetic_snapshot(machines: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    snapshot = pd.DataFrame({
+        'datetime': pd.Timestamp('2016-01-01 06:00'),
+        'volt_mean_24h': rng.normal(170, 5, machines),
+        'rotate_mean_24h': rng.normal(446, 20, machines),
+        'pressure_mean_24h': rng.normal(100, 4, machines),
+        'vibration_mean_24h': rng.normal(40, 2, machines),
+        'age': rng.integers(0, 21, machines).astype('float64'),
+    }, index=pd.Index(np.arange(1, machines + 1), name='machineID'))
+    for comp in COMPONENTS:
+        snapshot[f'hours_since_{comp}'] = rng.uniform(0, 24 * 365, machines)
+    return snapshot
+
+
+# the straightforward way: one dot product and two baseline lookups per machine and component
+def naive_scores(model: RiskModel, snapshot: pd.DataFrame) -> np.ndarray:
+    out = np.empty((len(snapshot), len(model.components)))
+    for m, (_, row) in enumerate(snapshot.iterrows()):
+        for c, comp in enumerate(model.components):
+            times, hazard = model.baselines[c]
+            linear = sum((row[k] - model.norm_mean[c][i]) * model.params[c][i]
+                         for i, k in enumerate(model.covariates))
+            t = row[f'hours_since_{comp}']
+            h0 = [hazard[j - 1] if j else 0.0 for j in np.searchsorted(times, [t, t + HORIZON_HOURS], 'right')]
+            out[m, c] = 1 - math.exp(-(h0[1] - h0[0]) * math.exp(linear))
+    return out
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--machines', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--model-dir', default='models')
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(args.model_dir, 'cox_coefficients.json')):
+        model = load_risk_model(args.model_dir)
+    else:
+        print(f"no coefficients in {args.model_dir}/, using random ones")
+        model = RiskModel(random_coefficients())
+
+    print(f"{'machines':>9}{'rank_fleet s':>14}{'machines/s':>14}")
+    for machines in args.machines:
+        snapshot = synthetic_snapshot(machines)
+        rank_fleet(model, snapshot)
+        ranked, seconds = timed(lambda: rank_fleet(model, snapshot))
+        print(f"{machines:>9}{seconds:>14.4f}{machines / seconds:>14,.0f}")
+
+    snapshot = synthetic_snapshot(min(args.machines))
+    slow, slow_s = timed(lambda: naive_scores(model, snapshot))
+    fast = rank_fleet(model, snapshot).loc[snapshot.index, [f'risk_{c}' for c in model.components]]
+    assert np.allclose(slow, fast.to_numpy())
+    print(f"per-machine loop on {min(args.machines)} machines: {slow_s:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
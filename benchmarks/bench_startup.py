@@ -0,0 +1,137 @@
+"""Cold start and per-interaction latency of the Streamlit front page, driven headless with
+streamlit.testing.AppTest, for the working tree and optionally an earlier commit.
+
+Each tree runs in its own interpreter. Measured there:
+- cold start: the first run with no data, imports included
+- first run with a synthetic fleet loaded
+- per tab, the first visit (which fills that tab's caches) and the median of warm reruns
+
+The --before commit is exported with git archive, so the comparison includes its modules.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--before HEAD~1] [--machines 100] [--hours 720] [--reruns 5]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = 'SensorSync_FrontPage.py'
+TABS = ["Overview", "Upload Data", "Exploratory Analysis", "Dashboard"]
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'scipy', 'sklearn']
+
+
+# runs inside a fresh interpreter with `tree` first on sys.path
+def measure(tree: str, csv_path: str, reruns: int) -> dict:
+    os.chdir(tree)
+    sys.path.insert(0, tree)
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(tree, APP), default_timeout=600)
+    start = time.perf_counter()
+    at.run()
+    result = {'cold_start': time.perf_counter() - start, 'exception': [e.message for e in at.exception],
+              'modules': len(sys.modules), 'heavy': [m for m in HEAVY_MODULES if m in sys.modules]}
+
+    from Sensor_Ingest import ingest_upload
+    with open(csv_path, 'rb') as f:
+        at.session_state['data'] = ingest_upload(f, os.path.basename(csv_path))
+    start = time.perf_counter()
+    at.run()
+    result['first_data_run'] = time.perf_counter() - start
+
+    result['tabs'] = {}
+    for tab in TABS:
+        # the tabs widget of an older tree has no key, so this only selects a tab where it exists
+        at.session_state['active_tab'] = tab
+        times = []
+        for _ in range(reruns + 1):
+            start = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - start)
+        result['tabs'][tab] = [times[0], statistics.median(times[1:])]
+    result['exception'] += [e.message for e in at.exception]
+    return result
+
+
+def run_tree(tree: str, csv_path: str, reruns: int) -> dict:
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', tree, csv_path, str(reruns)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def export_tree(ref: str, directory: str):
+    archive = subprocess.run(['git', 'archive', ref], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', directory], input=archive, check=True)
+
+
+# random Cox coefficients so the Dashboard scores the fleet instead of asking for training
+def write_models(tree: str):
+    from bench_scoring import random_coefficients
+    os.makedirs(os.path.join(tree, 'models'), exist_ok=True)
+    with open(os.path.join(tree, 'models', 'cox_coefficients.json'), 'w') as f:
+        json.dump(random_coefficients(), f)
+
+
+def main():
+    if sys.argv[1:2] == ['--worker']:
+        tree, csv_path, reruns = sys.argv[2:5]
+        print(json.dumps(measure(tree, csv_path, int(reruns))))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--before', help="git ref to compare the working tree against")
+    parser.add_argument('--machines', type=int, default=100)
+    parser.add_argument('--hours', type=int, default=720)
+    parser.add_argument('--reruns', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from Sensor_Join import join_pdm
+    from Sensor_Synthetic import generate_pdm
+
+    work = tempfile.mkdtemp(prefix='sensorsync-startup-')
+    try:
+        tables = generate_pdm(args.machines, args.hours)
+        csv_path = os.path.join(work, 'fleet.csv')
+        join_pdm(tables['telemetry'], tables['errors'], tables['failures'],
+                 tables['maint'], tables['machines']).to_csv(csv_path, index=False)
+
+        trees = {}
+        if args.before:
+            trees[args.before] = os.path.join(work, 'before')
+            os.makedirs(trees[args.before])
+            export_tree(args.before, trees[args.before])
+        trees['working tree'] = os.path.join(work, 'after')
+        shutil.copytree(ROOT, trees['working tree'], ignore=shutil.ignore_patterns('.git', 'Dataset', 'models'))
+
+        results = {}
+        for name, tree in trees.items():
+            write_models(tree)
+            results[name] = run_tree(tree, csv_path, args.reruns)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f"{args.machines} machines x {args.hours} hours, seconds; warm is the median of {args.reruns} reruns")
+    rows = [('cold start', 'cold_start'), ('first run with data', 'first_data_run')]
+    print(f"{'':<36}" + ''.join(f"{name:>16}" for name in results))
+    for label, key in rows:
+        print(f"{label:<36}" + ''.join(f"{r[key]:>16.3f}" for r in results.values()))
+    for tab in TABS:
+        for i, kind in enumerate(['first visit', 'warm']):
+            print(f"{tab + ', ' + kind:<36}" + ''.join(f"{r['tabs'][tab][i]:>16.3f}" for r in results.values()))
+    print(f"{'modules after cold start':<36}" + ''.join(f"{r['modules']:>16}" for r in results.values()))
+    print(f"{'heavy modules at start':<36}" + ''.join(f"{','.join(r['heavy']) or '-':>16}" for r in results.values()))
+    for name, r in results.items():
+        if r['exception']:
+            print(f"{name}: {r['exception']}")
+
+
+if __name__ == '__main__':
+    main()
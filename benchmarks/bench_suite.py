@@ -0,0 +1,142 @@
+"""Runs the main pipeline stages on synthetic PdM fleets from Sensor_Synthetic and appends
+seconds, rows/s and peak memory per stage to a JSON-lines history, comparing each stage with
+the last recorded run at the same scale. Each scale runs in a fresh process so its peak
+memory is its own.
+
+Run from the repository root:
+    python benchmarks/bench_suite.py [--machines 100 1000] [--hours 8761] [--seed 0]
+        [--results benchmarks/results.jsonl] [--tolerance 0.2] [--check]
+For a 100,000-machine fleet keep the span short, e.g. --machines 100000 --hours 168.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_scoring import random_coefficients  # noqa: E402
+from Sensor_Anomaly import detect_anomalies  # noqa: E402
+from Sensor_Data import SENSOR_COLS, manipulate_date, preprocess, round_value  # noqa: E402
+from Sensor_Join import join_pdm  # noqa: E402
+from Sensor_Loader import load_pdm  # noqa: E402
+from Sensor_Profile import Profiler, peak_rss_mb  # noqa: E402
+from Sensor_Rollup import Rollup  # noqa: E402
+from Sensor_Scoring import RiskModel, latest_snapshot, rank_fleet  # noqa: E402
+from Sensor_Synthetic import write_pdm  # noqa: E402
+
+
+# every stage at one scale, in the order the app runs them
+def run_scale(machines: int, hours: int, seed: int) -> tuple:
+    profiler = Profiler(enabled=True, log_path=None)
+    profiler.start_run()
+    baseline = peak_rss_mb()
+    data_dir = tempfile.mkdtemp(prefix='sensorsync-synthetic-')
+    try:
+        with profiler.stage('generate', rows=machines * hours):
+            write_pdm(data_dir, machines, hours, seed=seed)
+        with profiler.stage('load', rows=machines * hours):
+            tables = load_pdm(data_dir, cache_dir=None)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    rows = len(tables['telemetry'])
+    with profiler.stage('join', rows=rows):
+        joined = join_pdm(tables['telemetry'], tables['errors'], tables['failures'],
+                          tables['maint'], tables['machines'])
+    del tables
+    with profiler.stage('clean_and_preprocessing', rows=rows):
+        df = preprocess(joined)
+    with profiler.stage('manipulate_date+round_value', rows=rows):
+        legacy = joined.copy(deep=False)
+        manipulate_date(legacy)
+        round_value(legacy, SENSOR_COLS)
+    del legacy
+    with profiler.stage('rollup', rows=rows):
+        Rollup.from_frame(df)
+    with profiler.stage('snapshot', rows=rows):
+        snapshot = latest_snapshot(df)
+    with profiler.stage('scoring', rows=len(snapshot)):
+        rank_fleet(RiskModel(random_coefficients(seed)), snapshot)
+    with profiler.stage('anomalies', rows=rows):
+        detect_anomalies(df)
+    return profiler.frame().to_dict('records'), baseline
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def previous_runs(path: str) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['run', 'machines', 'hours', 'stage', 'seconds'])
+    return pd.read_json(path, lines=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--machines', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--hours', type=int, default=8761)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--results', default=os.path.join('benchmarks', 'results.jsonl'))
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="slowdown against the last run that counts as a regression")
+    parser.add_argument('--check', action='store_true', help="exit with status 1 on a regression")
+    args = parser.parse_args()
+
+    history = previous_runs(args.results)
+    context = {
+        'run': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': git_commit(), 'host': platform.node(),
+        'cpus': os.cpu_count(), 'python': platform.python_version(), 'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+    print(f"run {context['run']} at {context['commit']}, {context['cpus']} CPUs")
+
+    regressions = 0
+    for machines in args.machines:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            records, baseline = pool.submit(run_scale, machines, args.hours, args.seed).result()
+
+        print(f"\n{machines:,} machines x {args.hours:,} hours (process baseline {baseline:,.0f} MB)")
+        print(f"{'stage':<30}{'seconds':>10}{'M rows/s':>10}{'peak MB':>10}{'last run':>12}")
+        with open(args.results, 'a') as f:
+            for record in records:
+                entry = {**context, 'machines': machines, 'hours': args.hours, 'seed': args.seed,
+                         'stage': record['stage'], 'seconds': record['seconds'], 'rows': record['rows'],
+                         'rows_per_s': round(record['rows'] / record['seconds']), 'peak_rss_mb': record['peak_rss_mb']}
+                f.write(json.dumps(entry) + '\n')
+
+                last = history[(history['machines'] == machines) & (history['hours'] == args.hours)
+                               & (history['stage'] == record['stage'])]
+                change = ''
+                if len(last):
+                    ratio = record['seconds'] / last['seconds'].iloc[-1]
+                    slower = ratio > 1 + args.tolerance
+                    change = f"{ratio:.2f}x{' !' if slower else '  '}"
+                    regressions += slower
+                print(f"{record['stage']:<30}{record['seconds']:>10.2f}{entry['rows_per_s'] / 1e6:>10.2f}"
+                      f"{record['peak_rss_mb']:>10,.0f}{change:>12}")
+
+    print(f"\nappended to {args.results}")
+    if regressions:
+        print(f"{regressions} stage(s) more than {args.tolerance:.0%} slower than the last run (marked !)")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Times the vectorized Cox interval construction of Sensor_Survival.build_intervals against
+a naive per-machine loop (checking both give the same table), then serial vs process-pool
+fitting of the four component models.
+
+Run from the repository root:
+    python benchmarks/bench_survival.py [--data-dir Dataset] [--workers 4]
+"""
+import argparse
+import bisect
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Sensor_Data import preprocess  # noqa: E402
+from Sensor_Join import KEY_COLS  # noqa: E402
+from Sensor_Loader import load_pdm  # noqa: E402
+from Sensor_Survival import (COMPONENTS, COVARIATES, build_intervals,  # noqa: E402
+                             component_boundaries, covariate_snapshots, train_models)
+
+
+# the straightforward way: loop over machines and their snapshots one by one
+def naive_intervals(snapshots, boundaries, step='24h', covariates=COVARIATES):
+    step = pd.Timedelta(step)
+    hour = pd.Timedelta('1h')
+    positions = {m: i for i, m in enumerate(boundaries.index)}
+    rows = []
+    for machine, snaps in snapshots.groupby('machineID', sort=True):
+        mine = boundaries[boundaries['machineID'] == machine]
+        times = list(mine['datetime'])
+        failed = list(mine['failure'])
+        first = snaps['datetime'].iloc[0]
+        snap_times = list(snaps['datetime'])
+        for k, (_, snap) in enumerate(snaps.iterrows()):
+            t = snap['datetime']
+            j = bisect.bisect_right(times, t) - 1
+            spell_start = times[j] if j >= 0 else first
+            spell = positions[mine.index[j]] if j >= 0 else -1 - machine
+            nxt = snap_times[k + 1] if k + 1 < len(snap_times) else t + step
+            end = times[j + 1] if j + 1 < len(times) else None
+            stop = min(nxt, end) if end is not None else nxt
+            event = int(end is not None and end <= nxt and failed[j + 1])
+            rows.append([machine, spell, (t - spell_start) / hour, (stop - spell_start) / hour, event]
+                        + [snap[c] for c in covariates])
+    table = pd.DataFrame(rows, columns=['machineID', 'spell', 'start', 'stop', 'event'] + covariates)
+    keep = (table['stop'] > table['start']) & table[covariates].notna().all(axis=1)
+    return table[keep].reset_index(drop=True)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default='Dataset')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    pdm = load_pdm(args.data_dir, cache_dir=None)
+    telemetry = preprocess(pdm['telemetry'].sort_values(KEY_COLS, ignore_index=True))
+    snapshots, snapshot_s = timed(lambda: covariate_snapshots(telemetry, pdm['machines']))
+    boundaries = component_boundaries(pdm['maint'], pdm['failures'], 'comp1')
+
+    fast, fast_s = timed(lambda: build_intervals(snapshots, boundaries))
+    slow, slow_s = timed(lambda: naive_intervals(snapshots, boundaries))
+    assert len(fast) == len(slow)
+    for col in ['machineID', 'spell', 'start', 'stop', 'event']:
+        assert np.allclose(fast[col].to_numpy(float), slow[col].to_numpy(float)), col
+
+    print(f"{len(telemetry):,} readings -> {len(snapshots):,} snapshots ({snapshot_s:.2f}s)")
+    print(f"{'comp1 interval construction':<34}{'seconds':>10}")
+    print(f"{'naive per-machine loop':<34}{slow_s:>10.3f}")
+    print(f"{'build_intervals':<34}{fast_s:>10.3f}   ({slow_s / fast_s:.0f}x)")
+    print()
+
+    tables = {comp: build_intervals(snapshots, component_boundaries(pdm['maint'], pdm['failures'], comp))
+              for comp in COMPONENTS}
+    _, serial_s = timed(lambda: train_models(tables, max_workers=1))
+    _, pool_s = timed(lambda: train_models(tables, max_workers=args.workers))
+    print(f"{'fit 4 components':<34}{'seconds':>10}")
+    print(f"{'serial':<34}{serial_s:>10.2f}")
+    print(f"{f'process pool ({args.workers} workers)':<34}{pool_s:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()